@@ -1,49 +1,125 @@
 import matplotlib.pyplot as plt
+import msgpack
+import numpy as np
 import requests
 import subprocess
+import threading
 import time
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
+from requests.adapters import HTTPAdapter
 
 
 """
 Strategies Benchmarking
 """
-def send_http_request(url, headers, query, strategy, results):
+def parse_server_timing(header):
+    timings = {}
+    for entry in header.split(','):
+        name, _, params = entry.strip().partition(';')
+        duration = re.search(r'dur=([\d.]+)', params)
+        if name and duration:
+            timings[name] = float(duration.group(1)) / 1000
+    return timings
+
+
+def send_http_request(url, headers, query, strategy, results, session=None, lock=None, scheduled_start=None, response_format='json'):
+    client = session or requests
     try:
-        start = time.time()
-        response = requests.post(
+        start = scheduled_start or time.time()
+        response = client.post(
             url,
             headers=headers,
-            json={'query': query, 'strategy': strategy},
+            json={'query': query, 'strategy': strategy, 'format': response_format},
             timeout=30
         )
         elapsed = time.time() - start
-        
         if response.status_code == 200:
-            results['success'] += 1
-            data = response.json()
-            results['responses'].append({
-                'host': data.get('host', 'unknown'),
-                'time': elapsed
-            })
-        else:
-            results['failed'] += 1
+            data = msgpack.unpackb(response.content) if response_format == 'msgpack' else response.json()
+        
+        with lock or nullcontext():
+            if response.status_code == 200:
+                results['success'] += 1
+                results['responses'].append({
+                    'host': data.get('host', 'unknown'),
+                    'time': elapsed,
+                    'timing': parse_server_timing(response.headers.get('Server-Timing', ''))
+                })
+            else:
+                results['failed'] += 1
+                if 'Retry-After' in response.headers:
+                    results['shed'] += 1
     except Exception as e:
-        results['failed'] += 1
+        with lock or nullcontext():
+            results['failed'] += 1
         print(f'- Error: {str(e)}')
 
 
-def execute_strategy_requests(url, headers, query, strategy, request_type, count=1000):
+def create_keep_alive_session(concurrency):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=concurrency)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def execute_concurrent_requests(url, headers, query, strategy, request_type, count, concurrency, rate=None, response_format='json'):
+    import sys
+
+    mode = f'open-loop at {rate} req/s' if rate else f'closed-loop with {concurrency} virtual users'
+    print(f'- Sending {count} {request_type} requests ({mode})')
+
+    results = {'success': 0, 'failed': 0, 'shed': 0, 'total_time': 0, 'responses': [], 'count': count,
+               'concurrency': concurrency, 'rate': rate}
+    lock = threading.Lock()
+    session = create_keep_alive_session(concurrency)
+    start = time.time()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = []
+        for i in range(count):
+            scheduled_start = None
+            if rate:
+                scheduled_start = start + i / rate
+                delay = scheduled_start - time.time()
+                if delay > 0:
+                    time.sleep(delay)
+            futures.append(executor.submit(
+                send_http_request, url, headers, query, strategy, results, session, lock, scheduled_start, response_format
+            ))
+
+        for _ in as_completed(futures):
+            completed = results['success'] + results['failed']
+            sys.stdout.write(f'\r  Currently at {completed}/{count} requests (Success: {results["success"]}/{completed})')
+            sys.stdout.flush()
+
+    sys.stdout.write('\r' + ' ' * 80 + '\r')
+    session.close()
+
+    results['total_time'] = time.time() - start
+    results['throughput'] = results['success'] / results['total_time'] if results['total_time'] else 0.0
+    print(f"- {request_type} - Success: {results['success']}/{count}, Time: {results['total_time']:.2f}s, "
+          f"Throughput: {results['throughput']:.1f} req/s")
+
+    return results
+
+
+def execute_strategy_requests(url, headers, query, strategy, request_type, count=1000, concurrency=1, rate=None, response_format='json'):
     import sys
     
+    if concurrency > 1 or rate:
+        return execute_concurrent_requests(url, headers, query, strategy, request_type, count, concurrency, rate, response_format)
+
     print(f'- Sending {count} {request_type} requests')
     
-    results = {'success': 0, 'failed': 0, 'total_time': 0, 'responses': []}
+    results = {'success': 0, 'failed': 0, 'shed': 0, 'total_time': 0, 'responses': [], 'count': count,
+               'concurrency': 1, 'rate': None}
     start = time.time()
     
     for i in range(count):
-        send_http_request(url, headers, query, strategy, results)
+        send_http_request(url, headers, query, strategy, results, response_format=response_format)
         
 
         sys.stdout.write(f'\r  Currently at {i + 1}/{count} requests (Success: {results["success"]}/{i + 1})')
@@ -52,11 +128,89 @@ def execute_strategy_requests(url, headers, query, strategy, request_type, count
     sys.stdout.write('\r' + ' ' * 80 + '\r')
     
     results['total_time'] = time.time() - start
+    results['throughput'] = results['success'] / results['total_time'] if results['total_time'] else 0.0
     print(f"- {request_type} - Success: {results['success']}/{count}, Time: {results['total_time']:.2f}s")
     
     return results
 
 
+LATENCY_PERCENTILES = [50, 90, 99, 99.9]
+
+
+def compute_latency_stats(responses):
+    times = np.fromiter((resp['time'] for resp in responses), dtype=float)
+    if times.size == 0:
+        return {'count': 0, 'mean': 0.0, 'std': 0.0, 'min': 0.0, 'max': 0.0,
+                **{f'p{p:g}': 0.0 for p in LATENCY_PERCENTILES}}
+
+    percentiles = np.percentile(times, LATENCY_PERCENTILES)
+    return {
+        'count': int(times.size),
+        'mean': float(times.mean()),
+        'std': float(times.std()),
+        'min': float(times.min()),
+        'max': float(times.max()),
+        **{f'p{p:g}': float(v) for p, v in zip(LATENCY_PERCENTILES, percentiles)}
+    }
+
+
+TIMING_SEGMENTS = [
+    ('client network', lambda t, total: total - t['total']),
+    ('gatekeeper auth', lambda t, total: t.get('auth', 0.0)),
+    ('gatekeeper other', lambda t, total: t['total'] - t.get('auth', 0.0) - t.get('forward', 0.0) - t.get('serialise', 0.0)),
+    ('gatekeeper serialise', lambda t, total: t.get('serialise', 0.0)),
+    ('proxy hop', lambda t, total: t.get('forward', 0.0) - t.get('proxy-total', 0.0)),
+    ('proxy connect', lambda t, total: t.get('proxy-connect', 0.0)),
+    ('mysql execute', lambda t, total: t.get('proxy-execute', 0.0)),
+    ('mysql fetch', lambda t, total: t.get('proxy-fetch', 0.0)),
+    ('proxy serialise', lambda t, total: t.get('proxy-serialise', 0.0)),
+    ('proxy other', lambda t, total: t.get('proxy-total', 0.0) - sum(t.get(f'proxy-{phase}', 0.0) for phase in ('connect', 'execute', 'fetch', 'serialise')))
+]
+
+
+def compute_timing_breakdown(responses):
+    timed = [resp for resp in responses if 'total' in resp.get('timing', {})]
+    if not timed:
+        return {segment: 0.0 for segment, _ in TIMING_SEGMENTS}
+    return {segment: float(np.mean([max(share(resp['timing'], resp['time']), 0.0) for resp in timed]))
+            for segment, share in TIMING_SEGMENTS}
+
+
+def format_latency_stats(stats):
+    percentiles = ', '.join(f"p{p:g}: {stats[f'p{p:g}'] * 1000:.1f}" for p in LATENCY_PERCENTILES)
+    return (f"{percentiles}, min: {stats['min'] * 1000:.1f}, max: {stats['max'] * 1000:.1f}, "
+            f"std: {stats['std'] * 1000:.1f} (ms)")
+
+
+def export_latency_histograms(results, strategies, results_dir, ticks_per_half_distance=5):
+    histogram_file = os.path.join(results_dir, 'latency_histogram.hgrm')
+
+    with open(histogram_file, 'w') as f:
+        for strategy in strategies:
+            for request_type in ['read', 'write']:
+                times = np.sort(np.fromiter(
+                    (resp['time'] for resp in results['strategies'][strategy][request_type]['responses']), dtype=float
+                )) * 1000
+                if times.size == 0:
+                    continue
+
+                half_distances = int(np.ceil(np.log2(times.size))) + 1
+                levels = 1 - 0.5 ** (np.arange(half_distances * ticks_per_half_distance + 1) / ticks_per_half_distance)
+                levels = np.append(levels[levels < 1 - 1 / times.size], 1.0)
+                values = np.percentile(times, levels * 100)
+                counts = np.searchsorted(times, values, side='right')
+
+                f.write(f"# {strategy.upper()} {request_type.upper()} - Value in milliseconds\n")
+                f.write(f"{'Value':>12} {'Percentile':>14} {'TotalCount':>10} {'1/(1-Percentile)':>16}\n\n")
+                for value, level, total in zip(values, levels, counts):
+                    inverse = f'{1 / (1 - level):16.2f}' if level < 1 else f"{'inf':>16}"
+                    f.write(f'{value:12.3f} {level:14.12f} {total:10d} {inverse}\n')
+                f.write(f"#[Mean    = {times.mean():12.3f}, StdDeviation   = {times.std():12.3f}]\n")
+                f.write(f"#[Max     = {times.max():12.3f}, Total count    = {times.size:12d}]\n\n")
+
+    print('- Latency histograms saved: results/latency_histogram.hgrm')
+
+
 def save_benchmark_report(results, strategies, gatekeeper_ip, ip_to_role):
     project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     results_dir = os.path.join(project_root, 'results')
@@ -65,17 +219,31 @@ def save_benchmark_report(results, strategies, gatekeeper_ip, ip_to_role):
     
     results_file = os.path.join(results_dir, 'benchmark_result.txt')
     
+    load = results.get('load', {'concurrency': 1, 'rate': None})
+
     with open(results_file, 'w') as f:
         f.write(f"Benchmark Results - Gatekeeper: {gatekeeper_ip}\n")
+        if load['rate']:
+            f.write(f"Load: open-loop at {load['rate']} req/s (max {load['concurrency']} in flight)\n")
+        else:
+            f.write(f"Load: closed-loop with {load['concurrency']} virtual user(s)\n")
         f.write("-" * 50 + "\n")
         
         for strategy in strategies:
             data = results['strategies'][strategy]
-            read_avg = data['read']['total_time'] / 1000
-            write_avg = data['write']['total_time'] / 1000
+            read_stats = data['read']['latency']
+            write_stats = data['write']['latency']
             f.write(f"Strategy: {strategy.upper()}\n")
-            f.write(f"  READ  - Success: {data['read']['success']}, Avg: {read_avg:.4f}s\n")
-            f.write(f"  WRITE - Success: {data['write']['success']}, Avg: {write_avg:.4f}s\n\n")
+            f.write(f"  READ  - Success: {data['read']['success']}, Avg: {read_stats['mean']:.4f}s, "
+                    f"Throughput: {data['read']['throughput']:.1f} req/s\n")
+            f.write(f"          {format_latency_stats(read_stats)}\n")
+            f.write(f"  WRITE - Success: {data['write']['success']}, Avg: {write_stats['mean']:.4f}s, "
+                    f"Throughput: {data['write']['throughput']:.1f} req/s\n")
+            f.write(f"          {format_latency_stats(write_stats)}\n")
+            for request_type in ['read', 'write']:
+                breakdown = ', '.join(f'{segment}: {value * 1000:.2f}' for segment, value in data[request_type]['breakdown'].items())
+                f.write(f"  {request_type.upper():<5} - Breakdown (ms): {breakdown}\n")
+            f.write("\n")
 
         f.write("Host Distribution (READ):\n")
         for strategy in strategies:
@@ -86,10 +254,12 @@ def save_benchmark_report(results, strategies, gatekeeper_ip, ip_to_role):
                 hosts[role] = hosts.get(role, 0) + 1
             f.write(f"  {strategy.upper()}: {hosts}\n")
 
+    export_latency_histograms(results, strategies, results_dir)
+
     print('\n- All Cluster Benchmark results are available')
 
 
-def run_cluster_benchmark(gatekeeper_ip, manager_ip, worker_ips, api_key="test-api-key"):
+def run_cluster_benchmark(gatekeeper_ip, manager_ip, worker_ips, api_key="test-api-key", concurrency=1, rate=None, response_format='json'):
     ip_to_role = {manager_ip: 'manager'}
     for idx, ip in enumerate(worker_ips, 1):
         ip_to_role[ip] = f'worker-{idx}'
@@ -98,14 +268,18 @@ def run_cluster_benchmark(gatekeeper_ip, manager_ip, worker_ips, api_key="test-a
     headers = {'Content-Type': 'application/json', 'X-API-Key': api_key}
     read_query = "SELECT * FROM actor LIMIT 10"
     write_query = "INSERT INTO actor (first_name, last_name, last_update) VALUES ('Benchmark', 'Test', NOW())"
-    strategies = ['direct', 'random', 'customized']
-    results = {'strategies': {}}
+    strategies = ['direct', 'random', 'customized', 'lag_aware', 'least_outstanding']
+    results = {'strategies': {}, 'load': {'concurrency': concurrency, 'rate': rate}}
 
     for strategy in strategies:
         print(f'\n- Testing {strategy.upper()} strategy')
         
-        read_results = execute_strategy_requests(url, headers, read_query, strategy, 'READ')
-        write_results = execute_strategy_requests(url, headers, write_query, strategy, 'WRITE')
+        read_results = execute_strategy_requests(url, headers, read_query, strategy, 'READ', concurrency=concurrency, rate=rate, response_format=response_format)
+        write_results = execute_strategy_requests(url, headers, write_query, strategy, 'WRITE', concurrency=concurrency, rate=rate, response_format=response_format)
+        read_results['latency'] = compute_latency_stats(read_results['responses'])
+        write_results['latency'] = compute_latency_stats(write_results['responses'])
+        read_results['breakdown'] = compute_timing_breakdown(read_results['responses'])
+        write_results['breakdown'] = compute_timing_breakdown(write_results['responses'])
         
         results['strategies'][strategy] = {
             'read': read_results,
@@ -116,12 +290,187 @@ def run_cluster_benchmark(gatekeeper_ip, manager_ip, worker_ips, api_key="test-a
     return results
 
 
+def run_scaling_benchmark(gatekeeper_ip, api_key="test-api-key", strategy='random', concurrency_levels=(1, 2, 4, 8, 16, 32), count=500):
+    url = f'http://{gatekeeper_ip}:8080/query'
+    headers = {'Content-Type': 'application/json', 'X-API-Key': api_key}
+    read_query = "SELECT * FROM actor LIMIT 10"
+    scaling_results = {'strategy': strategy, 'levels': []}
+
+    print(f'\n- Measuring throughput scaling ({strategy.upper()} reads)')
+
+    for concurrency in concurrency_levels:
+        run = execute_strategy_requests(url, headers, read_query, strategy, f'READ x{concurrency}', count=count, concurrency=concurrency)
+        latency = compute_latency_stats(run['responses'])
+        scaling_results['levels'].append({
+            'concurrency': concurrency,
+            'throughput': run['throughput'],
+            'p50': latency['p50'],
+            'p99': latency['p99'],
+            'failed': run['failed'],
+            'shed': run['shed']
+        })
+
+    results_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'results')
+    os.makedirs(results_dir, exist_ok=True)
+
+    with open(os.path.join(results_dir, 'throughput_scaling.txt'), 'w') as f:
+        f.write(f"Throughput Scaling - Gatekeeper: {gatekeeper_ip}, Strategy: {strategy.upper()}\n")
+        f.write("-" * 50 + "\n")
+        for level in scaling_results['levels']:
+            f.write(f"  Concurrency {level['concurrency']:>3} - Throughput: {level['throughput']:.1f} req/s, "
+                    f"p50: {level['p50'] * 1000:.1f} ms, p99: {level['p99'] * 1000:.1f} ms, Failed: {level['failed']} (shed: {level['shed']})\n")
+
+    return scaling_results
+
+
+def run_worker_scaling_benchmark(gatekeeper_ip, set_workers, api_key="test-api-key", strategy='random', worker_counts=(1, None), concurrency=32, count=2000):
+    url = f'http://{gatekeeper_ip}:8080/query'
+    headers = {'Content-Type': 'application/json', 'X-API-Key': api_key}
+    read_query = "SELECT * FROM actor LIMIT 10"
+    worker_results = {'strategy': strategy, 'concurrency': concurrency, 'levels': []}
+
+    print(f'\n- Measuring throughput per worker count ({strategy.upper()} reads, {concurrency} clients)')
+
+    for workers in worker_counts:
+        configured = set_workers(workers)
+        if configured is None:
+            print(f"- ERROR: Could not restart services with {workers or 'nproc'} worker(s), skipping")
+            continue
+        run = execute_strategy_requests(url, headers, read_query, strategy, f"READ {configured['proxy']}/{configured['gatekeeper']} workers", count=count, concurrency=concurrency)
+        latency = compute_latency_stats(run['responses'])
+        worker_results['levels'].append({
+            'proxy_workers': configured['proxy'],
+            'gatekeeper_workers': configured['gatekeeper'],
+            'throughput': run['throughput'],
+            'p50': latency['p50'],
+            'p99': latency['p99'],
+            'failed': run['failed'],
+            'shed': run['shed']
+        })
+
+    if worker_counts and worker_counts[-1] is not None:
+        set_workers(None)
+
+    results_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'results')
+    os.makedirs(results_dir, exist_ok=True)
+
+    with open(os.path.join(results_dir, 'worker_scaling.txt'), 'w') as f:
+        f.write(f"Worker Scaling - Gatekeeper: {gatekeeper_ip}, Strategy: {strategy.upper()}, Concurrency: {concurrency}\n")
+        f.write("-" * 50 + "\n")
+        baseline = worker_results['levels'][0]['throughput'] if worker_results['levels'] else 0
+        for level in worker_results['levels']:
+            speedup = level['throughput'] / baseline if baseline > 0 else 0.0
+            f.write(f"  Proxy workers {level['proxy_workers']:>2}, Gatekeeper workers {level['gatekeeper_workers']:>2} - "
+                    f"Throughput: {level['throughput']:.1f} req/s ({speedup:.2f}x), "
+                    f"p50: {level['p50'] * 1000:.1f} ms, p99: {level['p99'] * 1000:.1f} ms, Failed: {level['failed']} (shed: {level['shed']})\n")
+
+    return worker_results
+
+
+def run_batch_benchmark(gatekeeper_ip, api_key="test-api-key", strategy='direct', batch_sizes=(1, 10, 50), total_statements=500):
+    url = f'http://{gatekeeper_ip}:8080/batch'
+    headers = {'Content-Type': 'application/json', 'X-API-Key': api_key}
+    write_query = "INSERT INTO actor (first_name, last_name, last_update) VALUES ('Benchmark', 'Batch', NOW())"
+    batch_results = {'strategy': strategy, 'levels': []}
+
+    print(f'\n- Measuring batched writes ({strategy.upper()})')
+
+    session = create_keep_alive_session(1)
+    for batch_size in batch_sizes:
+        round_trips = max(total_statements // batch_size, 1)
+        succeeded = 0
+        start_time = time.time()
+        for _ in range(round_trips):
+            try:
+                response = session.post(url, headers=headers, json={'statements': [write_query] * batch_size, 'strategy': strategy}, timeout=60)
+                if response.status_code == 200: succeeded += batch_size
+            except requests.exceptions.RequestException:
+                pass
+        duration = time.time() - start_time
+        batch_results['levels'].append({
+            'batch_size': batch_size,
+            'round_trips': round_trips,
+            'statements': succeeded,
+            'statements_per_second': succeeded / duration if duration > 0 else 0.0
+        })
+        print(f"  Batch size {batch_size:>3}: {succeeded} statements in {round_trips} round trips, {duration:.2f}s")
+    session.close()
+
+    results_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'results')
+    os.makedirs(results_dir, exist_ok=True)
+
+    with open(os.path.join(results_dir, 'batch_benchmark.txt'), 'w') as f:
+        f.write(f"Batched Writes - Gatekeeper: {gatekeeper_ip}, Strategy: {strategy.upper()}\n")
+        f.write("-" * 50 + "\n")
+        for level in batch_results['levels']:
+            f.write(f"  Batch size {level['batch_size']:>3} - Round trips: {level['round_trips']}, "
+                    f"Statements: {level['statements']}, Throughput: {level['statements_per_second']:.1f} stmt/s\n")
+
+    return batch_results
+
+
+def visualize_throughput_scaling(scaling_results):
+    results_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'results')
+    os.makedirs(results_dir, exist_ok=True)
+
+    levels = [level['concurrency'] for level in scaling_results['levels']]
+    throughput = [level['throughput'] for level in scaling_results['levels']]
+    p99 = [level['p99'] * 1000 for level in scaling_results['levels']]
+
+    fig, ax = plt.subplots(figsize=(10, 6))
+    ax.plot(levels, throughput, marker='o', color='blue', label='Throughput')
+    ax.set_xscale('log', base=2)
+    ax.set_xticks(levels)
+    ax.set_xticklabels([str(level) for level in levels])
+    ax.set_xlabel('Concurrent Clients')
+    ax.set_ylabel('Throughput (req/s)')
+    ax.set_title(f"Throughput Scaling ({scaling_results['strategy'].upper()} reads)")
+    ax.grid(alpha=0.3)
+
+    latency_ax = ax.twinx()
+    latency_ax.plot(levels, p99, marker='s', color='red', linestyle='--', label='p99 latency')
+    latency_ax.set_ylabel('p99 Latency (ms)')
+
+    lines = ax.get_lines() + latency_ax.get_lines()
+    ax.legend(lines, [line.get_label() for line in lines], loc='upper left')
+
+    plt.tight_layout()
+    plt.savefig(os.path.join(results_dir, 'throughput_scaling.png'), dpi=150)
+    print('\n- Chart saved: results/throughput_scaling.png')
+    plt.close()
+
+
+def visualize_worker_scaling(worker_results):
+    if not worker_results['levels']:
+        return
+
+    results_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'results')
+    os.makedirs(results_dir, exist_ok=True)
+
+    labels = [f"{level['proxy_workers']} / {level['gatekeeper_workers']}" for level in worker_results['levels']]
+    throughput = [level['throughput'] for level in worker_results['levels']]
+
+    fig, ax = plt.subplots(figsize=(8, 6))
+    bars = ax.bar(labels, throughput, color='steelblue')
+    for bar, value in zip(bars, throughput):
+        ax.text(bar.get_x() + bar.get_width() / 2, bar.get_height(), f'{value:.0f}', ha='center', va='bottom')
+    ax.set_xlabel('Workers (proxy / gatekeeper)')
+    ax.set_ylabel('Throughput (req/s)')
+    ax.set_title(f"Throughput per Worker Count ({worker_results['strategy'].upper()} reads, {worker_results['concurrency']} clients)")
+    ax.grid(axis='y', alpha=0.3)
+
+    plt.tight_layout()
+    plt.savefig(os.path.join(results_dir, 'worker_scaling.png'), dpi=150)
+    print('\n- Chart saved: results/worker_scaling.png')
+    plt.close()
+
+
 def visualize_cluster_benchmark(results, strategies):
     results_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'results')
     os.makedirs(results_dir, exist_ok=True)
     
-    read_times = [results['strategies'][s]['read']['total_time'] / 1000 for s in strategies]
-    write_times = [results['strategies'][s]['write']['total_time'] / 1000 for s in strategies]
+    read_times = [results['strategies'][s]['read']['latency']['mean'] for s in strategies]
+    write_times = [results['strategies'][s]['write']['latency']['mean'] for s in strategies]
     
     fig, ax = plt.subplots(figsize=(10, 6))
     
@@ -149,6 +498,63 @@ def visualize_cluster_benchmark(results, strategies):
     plt.close()
 
 
+def visualize_latency_breakdown(results, strategies):
+    results_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'results')
+    os.makedirs(results_dir, exist_ok=True)
+
+    fig, axes = plt.subplots(1, 2, figsize=(14, 6), sharey=True)
+    colors = plt.cm.tab10(np.arange(len(TIMING_SEGMENTS)))
+
+    for ax, request_type in zip(axes, ['read', 'write']):
+        bottom = np.zeros(len(strategies))
+        for (segment, _), color in zip(TIMING_SEGMENTS, colors):
+            values = np.array([results['strategies'][s][request_type]['breakdown'][segment] for s in strategies]) * 1000
+            ax.bar([s.upper() for s in strategies], values, bottom=bottom, label=segment, color=color)
+            bottom += values
+        ax.set_xlabel('Strategy')
+        ax.set_title(f'{request_type.upper()} Latency Breakdown')
+        ax.grid(axis='y', alpha=0.3)
+
+    axes[0].set_ylabel('Mean Latency (ms)')
+    axes[1].legend(loc='upper left', bbox_to_anchor=(1, 1))
+
+    plt.tight_layout()
+    plt.savefig(os.path.join(results_dir, 'latency_breakdown.png'), dpi=150)
+    print('\n- Chart saved: results/latency_breakdown.png')
+    plt.close()
+
+
+def visualize_latency_cdf(results, strategies):
+    results_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'results')
+    os.makedirs(results_dir, exist_ok=True)
+
+    fig, axes = plt.subplots(1, 2, figsize=(14, 6), sharey=True)
+
+    for ax, request_type in zip(axes, ['read', 'write']):
+        for strategy in strategies:
+            times = np.sort(np.fromiter(
+                (resp['time'] for resp in results['strategies'][strategy][request_type]['responses']), dtype=float
+            )) * 1000
+            if times.size == 0:
+                continue
+            ax.step(times, np.arange(1, times.size + 1) / times.size, where='post', label=strategy.upper())
+
+        for p in LATENCY_PERCENTILES[1:]:
+            ax.axhline(p / 100, color='grey', linestyle='--', linewidth=0.5)
+        ax.set_xscale('log')
+        ax.set_xlabel('Latency (ms)')
+        ax.set_title(f'{request_type.upper()} Latency CDF')
+        ax.legend()
+        ax.grid(alpha=0.3)
+
+    axes[0].set_ylabel('Fraction of Requests')
+
+    plt.tight_layout()
+    plt.savefig(os.path.join(results_dir, 'latency_cdf.png'), dpi=150)
+    print('\n- Chart saved: results/latency_cdf.png')
+    plt.close()
+
+
 """
 MySQL Sysbench
 """
@@ -183,6 +589,7 @@ def copy_file_via_scp(local_path, remote_host, remote_path, key_path, user='ubun
 
 def setup_ssh_key_on_gatekeeper(gatekeeper_ip, key_path):
     print('- Copying SSH key to gatekeeper')
+    run_ssh_command(gatekeeper_ip, 'rm -f ~/mysql-cluster-key.pem', key_path)
     if not copy_file_via_scp(key_path, gatekeeper_ip, '~/mysql-cluster-key.pem', key_path):
         print('- ERROR: Failed to copy SSH key')
         return False
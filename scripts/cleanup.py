@@ -1,5 +1,26 @@
+import boto3
 import sys
 import os
+import time
+from botocore.exceptions import ClientError
+from orchestration import run_dependency_graph
+
+
+RETRYABLE_ERRORS = ('DependencyViolation', 'InvalidIPAddress.InUse', 'InvalidNetworkInterface.InUse')
+
+
+def retry_on_dependency_violation(operation, attempts=8, initial_delay=2, max_delay=30, **kwargs):
+    delay = initial_delay
+    for attempt in range(1, attempts + 1):
+        try:
+            return operation(**kwargs)
+        except ClientError as e:
+            code = e.response['Error']['Code']
+            if code not in RETRYABLE_ERRORS or attempt == attempts:
+                raise
+            print(f'- {code} on {operation.__name__}, retrying in {delay}s')
+            time.sleep(delay)
+            delay = min(delay * 2, max_delay)
 
 
 def delete_ec2_instances(ec2_client, vpc_id):
@@ -62,8 +83,7 @@ def delete_nat_gateways(ec2_client, vpc_id):
             
             print('- Waiting for NAT Gateways to be deleted...')
             waiter = ec2_client.get_waiter('nat_gateway_deleted')
-            for nat_id in nat_gateway_ids:
-                waiter.wait(NatGatewayIds=[nat_id])
+            waiter.wait(NatGatewayIds=nat_gateway_ids)
             
             print('- NAT Gateways deleted successfully')
             
@@ -71,7 +91,7 @@ def delete_nat_gateways(ec2_client, vpc_id):
                 print(f'- Releasing {len(allocation_ids)} Elastic IP(s): {allocation_ids}')
                 for alloc_id in allocation_ids:
                     try:
-                        ec2_client.release_address(AllocationId=alloc_id)
+                        retry_on_dependency_violation(ec2_client.release_address, AllocationId=alloc_id)
                         print(f'- Elastic IP {alloc_id} released successfully')
                     except Exception as e:
                         print(f'- Warning: Could not release Elastic IP {alloc_id}: {e}')
@@ -96,7 +116,8 @@ def delete_internet_gateways(ec2_client, vpc_id):
             igw_id = igw['InternetGatewayId']
             print(f'- Detaching and deleting Internet Gateway: {igw_id}')
             
-            ec2_client.detach_internet_gateway(
+            retry_on_dependency_violation(
+                ec2_client.detach_internet_gateway,
                 InternetGatewayId=igw_id,
                 VpcId=vpc_id
             )
@@ -124,7 +145,7 @@ def delete_subnets(ec2_client, vpc_id):
         if subnet_ids:
             print(f'- Deleting {len(subnet_ids)} subnet(s): {subnet_ids}')
             for subnet_id in subnet_ids:
-                ec2_client.delete_subnet(SubnetId=subnet_id)
+                retry_on_dependency_violation(ec2_client.delete_subnet, SubnetId=subnet_id)
                 print(f'- Subnet {subnet_id} deleted')
             
             print('- All subnets deleted successfully')
@@ -152,8 +173,11 @@ def delete_route_tables(ec2_client, vpc_id):
             )
             
             if not is_main:
+                for assoc in route_table.get('Associations', []):
+                    ec2_client.disassociate_route_table(AssociationId=assoc['RouteTableAssociationId'])
+
                 print(f'- Deleting route table: {route_table_id}')
-                ec2_client.delete_route_table(RouteTableId=route_table_id)
+                retry_on_dependency_violation(ec2_client.delete_route_table, RouteTableId=route_table_id)
                 print(f'- Route table {route_table_id} deleted')
         
         print('- All custom route tables deleted successfully')
@@ -175,7 +199,7 @@ def delete_security_groups(ec2_client, vpc_id):
                 sg_id = sg['GroupId']
                 print(f'- Deleting security group: {sg_id} ({sg["GroupName"]})')
                 try:
-                    ec2_client.delete_security_group(GroupId=sg_id)
+                    retry_on_dependency_violation(ec2_client.delete_security_group, GroupId=sg_id)
                     print(f'- Security group {sg_id} deleted')
                 except Exception as e:
                     print(f'- Warning: Could not delete security group {sg_id}: {e}')
@@ -199,6 +223,11 @@ def delete_key_pair(ec2_client, key_name):
             print(f'- Local key file {pem_path} deleted')
         else:
             print(f'- Local key file {pem_path} not found (already deleted?)')
+
+        token_path = f'{key_name}.admin-token'
+        if os.path.exists(token_path):
+            os.remove(token_path)
+            print(f'- Local admin token {token_path} deleted')
             
     except ec2_client.exceptions.ClientError as e:
         if 'InvalidKeyPair.NotFound' in str(e):
@@ -212,47 +241,78 @@ def delete_key_pair(ec2_client, key_name):
 def delete_vpc(ec2_client, vpc_id):
     try:
         print(f'- Deleting VPC: {vpc_id}')
-        ec2_client.delete_vpc(VpcId=vpc_id)
+        retry_on_dependency_violation(ec2_client.delete_vpc, VpcId=vpc_id)
         print(f'- VPC {vpc_id} deleted successfully')
             
     except Exception as e:
         print(f'- Error deleting VPC: {e}')
 
 
-def cleanup_all_resources(ec2_client, vpc_id=None, vpc_name=None, key_name=None):
+def find_vpcs_by_name(ec2_client, vpc_name):
+    print(f'- Searching for VPCs with name: {vpc_name}')
+    response = ec2_client.describe_vpcs(
+        Filters=[{'Name': 'tag:Name', 'Values': [vpc_name]}]
+    )
+
+    vpc_ids = [vpc['VpcId'] for vpc in response['Vpcs']]
+    if vpc_ids:
+        print(f'- Found VPC(s): {vpc_ids}')
+    else:
+        print(f'- No VPC found with name: {vpc_name}')
+
+    return vpc_ids
+
+
+def vpc_cleanup_steps(ec2_client, vpc_id):
+    steps = {
+        'instances': ((), lambda r: delete_ec2_instances(ec2_client, vpc_id)),
+        'nat_gateways': ((), lambda r: delete_nat_gateways(ec2_client, vpc_id)),
+        'internet_gateways': (('instances', 'nat_gateways'), lambda r: delete_internet_gateways(ec2_client, vpc_id)),
+        'subnets': (('instances', 'nat_gateways'), lambda r: delete_subnets(ec2_client, vpc_id)),
+        'route_tables': ((), lambda r: delete_route_tables(ec2_client, vpc_id)),
+        'security_groups': (('instances',), lambda r: delete_security_groups(ec2_client, vpc_id)),
+        'vpc': (('internet_gateways', 'subnets', 'route_tables', 'security_groups'), lambda r: delete_vpc(ec2_client, vpc_id))
+    }
+
+    return {
+        f'{vpc_id}:{name}': (tuple(f'{vpc_id}:{dependency}' for dependency in dependencies), step)
+        for name, (dependencies, step) in steps.items()
+    }
+
+
+def cleanup_all_resources(ec2_client, vpc_id=None, vpc_name=None, key_name=None, vpc_ids=None):
     try:
-        if vpc_name and not vpc_id:
-            print(f'- Searching for VPC with name: {vpc_name}')
-            response = ec2_client.describe_vpcs(
-                Filters=[{'Name': 'tag:Name', 'Values': [vpc_name]}]
-            )
-            
-            if response['Vpcs']:
-                vpc_id = response['Vpcs'][0]['VpcId']
-                print(f'- Found VPC: {vpc_id}')
-            else:
-                print(f'- No VPC found with name: {vpc_name}')
-                return
-        
-        if not vpc_id:
+        vpc_ids = list(vpc_ids or [])
+        if vpc_id:
+            vpc_ids.append(vpc_id)
+        if vpc_name:
+            vpc_ids.extend(find_vpcs_by_name(ec2_client, vpc_name))
+        vpc_ids = list(dict.fromkeys(vpc_ids))
+
+        if not vpc_ids and not key_name:
             print('- Error: No VPC ID or name provided')
             return
-        
-        print(f'- Starting cleanup for VPC: {vpc_id}')
-        delete_ec2_instances(ec2_client, vpc_id)        
-        delete_nat_gateways(ec2_client, vpc_id)
-        delete_internet_gateways(ec2_client, vpc_id)
-        delete_subnets(ec2_client, vpc_id)
-        delete_route_tables(ec2_client, vpc_id)
-        delete_security_groups(ec2_client, vpc_id)
-        delete_vpc(ec2_client, vpc_id)
+
+        print(f'- Starting cleanup for VPC(s): {vpc_ids}')
+        steps = {}
+        for cleanup_vpc_id in vpc_ids:
+            steps.update(vpc_cleanup_steps(ec2_client, cleanup_vpc_id))
 
         if key_name:
-            delete_key_pair(ec2_client, key_name)
-        
-        print(f'- Cleanup completed successfully for VPC: {vpc_id}')
+            steps['key_pair'] = ((), lambda r: delete_key_pair(ec2_client, key_name))
+
+        run_dependency_graph(steps)
+
+        print(f'- Cleanup completed successfully for VPC(s): {vpc_ids}')
         
     except Exception as e:
         print(f'Fatal error during cleanup: {e}')
         sys.exit(1)
 
+
+if __name__ == '__main__':
+    cleanup_all_resources(
+        boto3.client('ec2', region_name=os.getenv('AWS_DEFAULT_REGION', 'us-east-1')),
+        vpc_name=sys.argv[1] if len(sys.argv) > 1 else 'mysql-cluster-vpc',
+        key_name=sys.argv[2] if len(sys.argv) > 2 else None
+    )
@@ -1,11 +1,15 @@
 import boto3
-import time
+import gzip
 import configparser
 import sys
 import re
 import os
+import secrets
+import threading
 from cleanup import cleanup_all_resources
-from benchmark import run_cluster_benchmark, collect_sysbench, visualize_cluster_benchmark, visualize_sysbench_results
+from orchestration import run_dependency_graph
+from readiness import wait_for_cluster_ready, set_service_workers
+from benchmark import run_cluster_benchmark, collect_sysbench, visualize_cluster_benchmark, visualize_sysbench_results, visualize_latency_cdf, run_scaling_benchmark, visualize_throughput_scaling, run_worker_scaling_benchmark, visualize_worker_scaling, run_batch_benchmark, visualize_latency_breakdown
 
 
 """
@@ -75,13 +79,13 @@ def getAWSCredentials() -> tuple[str, str, str | None]:
         sys.exit(1)
 
 
-def setBoto3Clients():
+def setBoto3Clients(ec2_client=None):
     try:
         print('- Starting setting up the boto3 clients')
 
         global EC2_CLIENT
 
-        EC2_CLIENT = boto3.client(
+        EC2_CLIENT = ec2_client or boto3.client(
             'ec2',
             aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
             aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
@@ -130,20 +134,54 @@ def read_user_data(filename: str, **kwargs) -> str:
         sys.exit(1)
 
 
+USER_DATA_LIMIT = 16384
+
+INSTANCE_INVENTORY = {}
+inventory_lock = threading.Lock()
+
+
+def cache_instances(instances):
+    with inventory_lock:
+        INSTANCE_INVENTORY.update((instance['InstanceId'], instance) for instance in instances)
+
+
+def describe_instances(instance_ids, refresh=False):
+    with inventory_lock:
+        missing = [iid for iid in instance_ids if refresh or iid not in INSTANCE_INVENTORY]
+
+    if missing:
+        paginator = EC2_CLIENT.get_paginator('describe_instances')
+        cache_instances([
+            instance
+            for page in paginator.paginate(InstanceIds=missing)
+            for reservation in page['Reservations']
+            for instance in reservation['Instances']
+        ])
+
+    with inventory_lock:
+        return [INSTANCE_INVENTORY[iid] for iid in instance_ids]
+
+
+def get_instance_private_ips(instance_ids):
+    return [instance['PrivateIpAddress'] for instance in describe_instances(instance_ids)]
+
+
 def get_instance_private_ip(instance_id):
-    response = EC2_CLIENT.describe_instances(InstanceIds=[instance_id])
-    return response['Reservations'][0]['Instances'][0]['PrivateIpAddress']
+    return get_instance_private_ips([instance_id])[0]
 
 
 def get_instance_public_ip(instance_id):
-    response = EC2_CLIENT.describe_instances(InstanceIds=[instance_id])
-    return response['Reservations'][0]['Instances'][0].get('PublicIpAddress', '')
+    instance = describe_instances([instance_id])[0]
+    if 'PublicIpAddress' not in instance:
+        instance = describe_instances([instance_id], refresh=True)[0]
+    return instance.get('PublicIpAddress', '')
 
 
 def wait_for_instance_running(instance_ids):
     print(f'- Waiting for instances {instance_ids} to be running...')
     waiter = EC2_CLIENT.get_waiter('instance_running')
     waiter.wait(InstanceIds=instance_ids)
+    describe_instances(instance_ids, refresh=True)
     print(f'- Instances {instance_ids} are now running')
 
 
@@ -395,18 +433,18 @@ def createSecurityGroup(vpc_id, sg_name='log8415e-sg', sg_description='Security
         
         if ingress_rules:
             print('- Adding ingress rules to Security Group')
-            for rule in ingress_rules:
-                EC2_CLIENT.authorize_security_group_ingress(
-                    GroupId=security_group_id,
-                    IpPermissions=[
-                        {
-                            'IpProtocol': rule['IpProtocol'],
-                            'FromPort': rule['FromPort'],
-                            'ToPort': rule['ToPort'],
-                            'IpRanges': [{'CidrIp': rule['CidrIp'], 'Description': rule['Description']}]
-                        }
-                    ]
-                )
+            EC2_CLIENT.authorize_security_group_ingress(
+                GroupId=security_group_id,
+                IpPermissions=[
+                    {
+                        'IpProtocol': rule['IpProtocol'],
+                        'FromPort': rule['FromPort'],
+                        'ToPort': rule['ToPort'],
+                        'IpRanges': [{'CidrIp': rule['CidrIp'], 'Description': rule['Description']}]
+                    }
+                    for rule in ingress_rules
+                ]
+            )
         
         if egress_rules:
             print('- Adding egress rules to Security Group')
@@ -423,18 +461,18 @@ def createSecurityGroup(vpc_id, sg_name='log8415e-sg', sg_description='Security
             except Exception as e:
                 print(f'- Note: Could not remove default egress rule: {e}')
             
-            for rule in egress_rules:
-                EC2_CLIENT.authorize_security_group_egress(
-                    GroupId=security_group_id,
-                    IpPermissions=[
-                        {
-                            'IpProtocol': rule['IpProtocol'],
-                            'FromPort': rule['FromPort'],
-                            'ToPort': rule['ToPort'],
-                            'IpRanges': [{'CidrIp': rule['CidrIp'], 'Description': rule['Description']}]
-                        }
-                    ]
-                )
+            EC2_CLIENT.authorize_security_group_egress(
+                GroupId=security_group_id,
+                IpPermissions=[
+                    {
+                        'IpProtocol': rule['IpProtocol'],
+                        'FromPort': rule['FromPort'],
+                        'ToPort': rule['ToPort'],
+                        'IpRanges': [{'CidrIp': rule['CidrIp'], 'Description': rule['Description']}]
+                    }
+                    for rule in egress_rules
+                ]
+            )
         
         print(f'- Security Group created successfully: {security_group_id}')
         
@@ -464,32 +502,38 @@ def createEC2Instance(
             'SubnetId': subnet_id,
             'MinCount': count,
             'MaxCount': count,
+            'TagSpecifications': [
+                {
+                    'ResourceType': 'instance',
+                    'Tags': [
+                        {
+                            'Key': 'Name',
+                            'Value': instance_name
+                        }
+                    ]
+                }
+            ]
         }
         
         if security_group_id:
             run_params['SecurityGroupIds'] = [security_group_id]
         
         if user_data:
-            run_params['UserData'] = user_data
+            if len(user_data.encode()) > USER_DATA_LIMIT:
+                compressed = gzip.compress(user_data.encode())
+                if len(compressed) > USER_DATA_LIMIT:
+                    raise ValueError(f'User data for {instance_name} is {len(compressed)} bytes after gzip, over the {USER_DATA_LIMIT}-byte EC2 limit')
+                run_params['UserData'] = compressed
+            else:
+                run_params['UserData'] = user_data
 
         if key_name:
             run_params['KeyName'] = key_name
         
         response = EC2_CLIENT.run_instances(**run_params)
         
+        cache_instances(response['Instances'])
         instance_ids = [instance['InstanceId'] for instance in response['Instances']]
-
-        for i, instance_id in enumerate(instance_ids):
-            tag_name = instance_name if count == 1 else f'{instance_name}-{i+1}'
-            EC2_CLIENT.create_tags(
-                Resources=[instance_id],
-                Tags=[
-                    {
-                        'Key': 'Name',
-                        'Value': tag_name
-                    }
-                ]
-            )
         
         print(f'- Created instance(s) successfully: {instance_ids}')
         
@@ -537,12 +581,32 @@ def create_or_get_key_pair(key_name='mysql-cluster-key'):
         sys.exit(1)
 
 
+def create_admin_token(key_name='mysql-cluster-key'):
+    token = secrets.token_urlsafe(32)
+    token_path = f'{key_name}.admin-token'
+    with open(token_path, 'w') as f:
+        f.write(token)
+
+    if os.name != 'nt':
+        os.chmod(token_path, 0o600)
+
+    print(f'- Proxy admin token saved to: {token_path}')
+
+    return token
+
+
+def read_admin_token(key_name='mysql-cluster-key'):
+    token_path = f'{key_name}.admin-token'
+    if not os.path.exists(token_path):
+        return ''
+    with open(token_path) as f:
+        return f.read().strip()
+
+
 """
     MySQL Standalone and Sakila
 """
-def create_manager_instances(nbrInstances: int, vpcId: str, subnetId: str, private_subnet_cidr: str, public_subnet_cidr: str, key_name: str) -> tuple[list[str], list[str]]:
-    print(f'- creating {nbrInstances} new manager instances')
-
+def create_manager_security_group(vpcId: str, private_subnet_cidr: str, public_subnet_cidr: str) -> str:
     ingress = [
         {
             'IpProtocol': 'tcp',
@@ -591,15 +655,21 @@ def create_manager_instances(nbrInstances: int, vpcId: str, subnetId: str, priva
         }
     ]
 
-    userData = read_user_data('manager.tpl')
-
-    sgId = createSecurityGroup(
+    return createSecurityGroup(
         vpc_id=vpcId,
         sg_name='manager-sg',
         sg_description='Security group for MySQL manager node',
         ingress_rules=ingress,
         egress_rules=egress
     )
+
+
+def create_manager_instances(nbrInstances: int, vpcId: str, subnetId: str, private_subnet_cidr: str, public_subnet_cidr: str, key_name: str, security_group_id: str | None = None, wait_until_running: bool = True) -> tuple[list[str], list[str]]:
+    print(f'- creating {nbrInstances} new manager instances')
+
+    userData = read_user_data('manager.tpl')
+
+    sgId = security_group_id or create_manager_security_group(vpcId, private_subnet_cidr, public_subnet_cidr)
     
     instancesId = createEC2Instance(
         subnet_id=subnetId,
@@ -611,9 +681,10 @@ def create_manager_instances(nbrInstances: int, vpcId: str, subnetId: str, priva
         key_name=key_name
     )
     
-    wait_for_instance_running(instancesId)
+    if wait_until_running:
+        wait_for_instance_running(instancesId)
     
-    instance_ips = [get_instance_private_ip(iid) for iid in instancesId]
+    instance_ips = get_instance_private_ips(instancesId)
     
     print(f'- Manager instances created: {instancesId}')
     print(f'- Manager IPs: {instance_ips}')
@@ -621,9 +692,7 @@ def create_manager_instances(nbrInstances: int, vpcId: str, subnetId: str, priva
     return instancesId, instance_ips
 
 
-def create_worker_instances(nbrInstances: int, vpcId: str, subnetId: str, private_subnet_cidr: str, public_subnet_cidr: str, manager_ip: str, key_name: str) -> tuple[list[str], list[str]]:
-    print(f'- creating {nbrInstances} new worker instances')
-
+def create_worker_security_group(vpcId: str, private_subnet_cidr: str, public_subnet_cidr: str) -> str:
     ingress = [
         {
             'IpProtocol': 'tcp',
@@ -672,9 +741,7 @@ def create_worker_instances(nbrInstances: int, vpcId: str, subnetId: str, privat
         }
     ]
 
-    userData = read_user_data('worker.tpl', manager_host=manager_ip)
-    
-    sgId = createSecurityGroup(
+    return createSecurityGroup(
         vpc_id=vpcId,
         sg_name='worker-sg',
         sg_description='Security group for MySQL worker nodes',
@@ -682,6 +749,14 @@ def create_worker_instances(nbrInstances: int, vpcId: str, subnetId: str, privat
         egress_rules=egress
     )
 
+
+def create_worker_instances(nbrInstances: int, vpcId: str, subnetId: str, private_subnet_cidr: str, public_subnet_cidr: str, manager_ip: str, key_name: str, security_group_id: str | None = None, wait_until_running: bool = True) -> tuple[list[str], list[str]]:
+    print(f'- creating {nbrInstances} new worker instances')
+
+    userData = read_user_data('worker.tpl', manager_host=manager_ip)
+    
+    sgId = security_group_id or create_worker_security_group(vpcId, private_subnet_cidr, public_subnet_cidr)
+
     instancesId = createEC2Instance(
         subnet_id=subnetId,
         instance_type='t2.micro',
@@ -692,9 +767,10 @@ def create_worker_instances(nbrInstances: int, vpcId: str, subnetId: str, privat
         key_name=key_name
     )
     
-    wait_for_instance_running(instancesId)
+    if wait_until_running:
+        wait_for_instance_running(instancesId)
     
-    instance_ips = [get_instance_private_ip(iid) for iid in instancesId]
+    instance_ips = get_instance_private_ips(instancesId)
     
     print(f'- Worker instances created: {instancesId}')
     print(f'- Worker IPs: {instance_ips}')
@@ -705,9 +781,7 @@ def create_worker_instances(nbrInstances: int, vpcId: str, subnetId: str, privat
 """
     Proxy
 """
-def create_proxy_instance(vpcId: str, subnetId: str, public_subnet_cidr: str, private_subnet_cidr: str, manager_ip: str, worker_ips: list[str]) -> tuple[str, str]:
-    print('- Creating Proxy instance')
-    
+def create_proxy_security_group(vpcId: str, public_subnet_cidr: str, private_subnet_cidr: str) -> str:
     ingress = [
         {
             'IpProtocol': 'tcp',
@@ -748,17 +822,25 @@ def create_proxy_instance(vpcId: str, subnetId: str, public_subnet_cidr: str, pr
             'Description': 'ICMP for ping checks to workers and manager'
         }
     ]
-    
-    worker_hosts_str = ','.join(worker_ips)
-    userData = read_user_data('proxy.tpl', manager_host=manager_ip, worker_hosts=worker_hosts_str)
 
-    sgId = createSecurityGroup(
+    return createSecurityGroup(
         vpc_id=vpcId,
         sg_name='proxy-sg',
         sg_description='Security group for Proxy (Trusted Host) - NOT internet-facing',
         ingress_rules=ingress,
         egress_rules=egress
     )
+
+
+def create_proxy_instance(vpcId: str, subnetId: str, public_subnet_cidr: str, private_subnet_cidr: str, manager_ip: str, worker_ips: list[str], proxy_mode: str = 'wsgi', worker_weights: list[float] | None = None, admin_token: str = '', security_group_id: str | None = None, wait_until_running: bool = True) -> tuple[str, str]:
+    print('- Creating Proxy instance')
+    
+    worker_hosts_str = ','.join(worker_ips)
+    worker_weights_str = ','.join(str(weight) for weight in worker_weights or [])
+    userData = read_user_data('proxy.tpl', manager_host=manager_ip, worker_hosts=worker_hosts_str, proxy_mode=proxy_mode,
+                              worker_weights=worker_weights_str, proxy_admin_token=admin_token)
+
+    sgId = security_group_id or create_proxy_security_group(vpcId, public_subnet_cidr, private_subnet_cidr)
     
     instancesId = createEC2Instance(
         subnet_id=subnetId,
@@ -769,7 +851,8 @@ def create_proxy_instance(vpcId: str, subnetId: str, public_subnet_cidr: str, pr
         count=1
     )
     
-    wait_for_instance_running(instancesId)
+    if wait_until_running:
+        wait_for_instance_running(instancesId)
     
     proxy_ip = get_instance_private_ip(instancesId[0])
     
@@ -782,9 +865,7 @@ def create_proxy_instance(vpcId: str, subnetId: str, public_subnet_cidr: str, pr
 """
     Gatekeeper
 """
-def create_gatekeeper_instance(vpcId: str, subnetId: str, private_subnet_cidr: str, proxy_ip: str, key_name: str) -> tuple[str, str]:
-    print('- Creating Gatekeeper instance')
-    
+def create_gatekeeper_security_group(vpcId: str, private_subnet_cidr: str) -> str:
     ingress = [
         {
             'IpProtocol': 'tcp',
@@ -847,15 +928,21 @@ def create_gatekeeper_instance(vpcId: str, subnetId: str, private_subnet_cidr: s
         }
     ]
 
-    userData = read_user_data('gatekeeper.tpl', proxy_host=proxy_ip)
-
-    sgId = createSecurityGroup(
+    return createSecurityGroup(
         vpc_id=vpcId,
         sg_name='gatekeeper-sg',
         sg_description='Security group for Gatekeeper - Internet-facing',
         ingress_rules=ingress,
         egress_rules=egress
     )
+
+
+def create_gatekeeper_instance(vpcId: str, subnetId: str, private_subnet_cidr: str, proxy_ip: str, key_name: str, gatekeeper_mode: str = 'wsgi', security_group_id: str | None = None, wait_until_running: bool = True) -> tuple[str, str]:
+    print('- Creating Gatekeeper instance')
+    
+    userData = read_user_data('gatekeeper.tpl', proxy_host=proxy_ip, gatekeeper_mode=gatekeeper_mode)
+
+    sgId = security_group_id or create_gatekeeper_security_group(vpcId, private_subnet_cidr)
     
     instancesId = createEC2Instance(
         subnet_id=subnetId,
@@ -867,7 +954,8 @@ def create_gatekeeper_instance(vpcId: str, subnetId: str, private_subnet_cidr: s
         key_name=key_name
     )
     
-    wait_for_instance_running(instancesId)
+    if wait_until_running:
+        wait_for_instance_running(instancesId)
     
     gatekeeper_ip = get_instance_public_ip(instancesId[0])
     
@@ -877,6 +965,104 @@ def create_gatekeeper_instance(vpcId: str, subnetId: str, private_subnet_cidr: s
     return instancesId[0], gatekeeper_ip
 
 
+"""
+    Provisioning
+"""
+def provision_cluster(vpc_cidr: str, public_subnet_cidr: str, private_subnet_cidr: str, availability_zone: str, nbr_workers: int = 2,
+                      proxy_mode: str = 'wsgi', worker_weights: list[float] | None = None, gatekeeper_mode: str = 'wsgi') -> dict:
+    steps = {
+        'key_pair': ((), lambda r: create_or_get_key_pair('mysql-cluster-key')),
+        'admin_token': ((), lambda r: create_admin_token('mysql-cluster-key')),
+        'vpc': ((), lambda r: createVPC(cidr_block=vpc_cidr, vpc_name='mysql-cluster-vpc')),
+        'public_subnet': (('vpc',), lambda r: createSubnet(
+            vpc_id=r['vpc'],
+            cidr_block=public_subnet_cidr,
+            availability_zone=availability_zone,
+            subnet_name='public-subnet',
+            is_public=True
+        )),
+        'private_subnet': (('vpc',), lambda r: createSubnet(
+            vpc_id=r['vpc'],
+            cidr_block=private_subnet_cidr,
+            availability_zone=availability_zone,
+            subnet_name='private-subnet',
+            is_public=False
+        )),
+        'igw': (('vpc',), lambda r: createInternetGateway(vpc_id=r['vpc'], igw_name='mysql-cluster-igw')),
+        'nat_gateway': (('public_subnet', 'igw'), lambda r: createNATGateway(subnet_id=r['public_subnet'], nat_name='mysql-cluster-nat')),
+        'public_route_table': (('igw',), lambda r: createRoutingTable(
+            vpc_id=r['vpc'],
+            igw_id=r['igw'],
+            route_table_name='public-route-table',
+            is_public=True
+        )),
+        'private_route_table': (('nat_gateway',), lambda r: createRoutingTable(
+            vpc_id=r['vpc'],
+            nat_gateway_id=r['nat_gateway'],
+            route_table_name='private-route-table',
+            is_public=False
+        )),
+        'public_routes': (('public_route_table', 'public_subnet'), lambda r: associateRouteTable(r['public_route_table'], r['public_subnet'])),
+        'private_routes': (('private_route_table', 'private_subnet'), lambda r: associateRouteTable(r['private_route_table'], r['private_subnet'])),
+        'manager_sg': (('vpc',), lambda r: create_manager_security_group(r['vpc'], private_subnet_cidr, public_subnet_cidr)),
+        'worker_sg': (('vpc',), lambda r: create_worker_security_group(r['vpc'], private_subnet_cidr, public_subnet_cidr)),
+        'proxy_sg': (('vpc',), lambda r: create_proxy_security_group(r['vpc'], public_subnet_cidr, private_subnet_cidr)),
+        'gatekeeper_sg': (('vpc',), lambda r: create_gatekeeper_security_group(r['vpc'], private_subnet_cidr)),
+        'manager': (('key_pair', 'private_routes', 'manager_sg'), lambda r: create_manager_instances(
+            nbrInstances=1,
+            vpcId=r['vpc'],
+            subnetId=r['private_subnet'],
+            private_subnet_cidr=private_subnet_cidr,
+            public_subnet_cidr=public_subnet_cidr,
+            key_name=r['key_pair'][0],
+            security_group_id=r['manager_sg'],
+            wait_until_running=False
+        )),
+        'workers': (('manager', 'worker_sg'), lambda r: create_worker_instances(
+            nbrInstances=nbr_workers,
+            vpcId=r['vpc'],
+            subnetId=r['private_subnet'],
+            private_subnet_cidr=private_subnet_cidr,
+            public_subnet_cidr=public_subnet_cidr,
+            manager_ip=r['manager'][1][0],
+            key_name=r['key_pair'][0],
+            security_group_id=r['worker_sg'],
+            wait_until_running=False
+        )),
+        'proxy': (('workers', 'proxy_sg', 'admin_token'), lambda r: create_proxy_instance(
+            vpcId=r['vpc'],
+            subnetId=r['private_subnet'],
+            public_subnet_cidr=public_subnet_cidr,
+            private_subnet_cidr=private_subnet_cidr,
+            manager_ip=r['manager'][1][0],
+            worker_ips=r['workers'][1],
+            proxy_mode=proxy_mode,
+            worker_weights=worker_weights,
+            admin_token=r['admin_token'],
+            security_group_id=r['proxy_sg'],
+            wait_until_running=False
+        )),
+        'gatekeeper': (('proxy', 'public_routes', 'gatekeeper_sg'), lambda r: create_gatekeeper_instance(
+            vpcId=r['vpc'],
+            subnetId=r['public_subnet'],
+            private_subnet_cidr=private_subnet_cidr,
+            proxy_ip=r['proxy'][1],
+            key_name=r['key_pair'][0],
+            gatekeeper_mode=gatekeeper_mode,
+            security_group_id=r['gatekeeper_sg'],
+            wait_until_running=False
+        )),
+        'running': (('gatekeeper',), lambda r: wait_for_instance_running(
+            r['manager'][0] + r['workers'][0] + [r['proxy'][0], r['gatekeeper'][0]]
+        ))
+    }
+
+    results = run_dependency_graph(steps)
+    results['gatekeeper_public_ip'] = get_instance_public_ip(results['gatekeeper'][0])
+
+    return results
+
+
 def main():
     print('')
     print('*'*16 + ' AWS BOTO3 SCRIPT ' + '*'*16)
@@ -889,83 +1075,37 @@ def main():
     PUBLIC_SUBNET_CIDR = '10.0.1.0/24'
     PRIVATE_SUBNET_CIDR = '10.0.2.0/24'
     AVAILABILITY_ZONE = 'us-east-1a'
+    WORKER_COUNT = 2
+    PROXY_MODE = 'wsgi'
+    WORKER_WEIGHTS = None
+    GATEKEEPER_MODE = 'wsgi'
+    BENCHMARK_CONCURRENCY = 1
+    BENCHMARK_RATE = None
+    BENCHMARK_FORMAT = 'json'
+    BENCHMARK_SCALING_LEVELS = [1, 2, 4, 8, 16, 32]
+    BENCHMARK_WORKER_COUNTS = [1, None]
+    BENCHMARK_BATCH_SIZES = [1, 10, 50]
 
 
     print('*'*16 + ' CREATION INFRA ' + '*'*18)
-    key_name, key_path = create_or_get_key_pair('mysql-cluster-key')
-    vpc_id = createVPC(cidr_block=VPC_CIDR, vpc_name='mysql-cluster-vpc')
-
-    public_subnet_id = createSubnet(
-        vpc_id=vpc_id,
-        cidr_block=PUBLIC_SUBNET_CIDR,
-        availability_zone=AVAILABILITY_ZONE,
-        subnet_name='public-subnet',
-        is_public=True
-    )
-    
-    private_subnet_id = createSubnet(
-        vpc_id=vpc_id,
-        cidr_block=PRIVATE_SUBNET_CIDR,
-        availability_zone=AVAILABILITY_ZONE,
-        subnet_name='private-subnet',
-        is_public=False
-    )
-
-    igw_id = createInternetGateway(vpc_id=vpc_id, igw_name='mysql-cluster-igw')
-    nat_gateway_id = createNATGateway(subnet_id=public_subnet_id, nat_name='mysql-cluster-nat')
-
-    public_route_table_id = createRoutingTable(
-        vpc_id=vpc_id,
-        igw_id=igw_id,
-        route_table_name='public-route-table',
-        is_public=True
-    )
-    
-    private_route_table_id = createRoutingTable(
-        vpc_id=vpc_id,
-        nat_gateway_id=nat_gateway_id,
-        route_table_name='private-route-table',
-        is_public=False
-    )
-    
-    associateRouteTable(public_route_table_id, public_subnet_id)
-    associateRouteTable(private_route_table_id, private_subnet_id)
-
-    manager_ids, manager_ips = create_manager_instances(
-        nbrInstances=1,
-        vpcId=vpc_id,
-        subnetId=private_subnet_id,
-        private_subnet_cidr=PRIVATE_SUBNET_CIDR,
-        public_subnet_cidr=PUBLIC_SUBNET_CIDR,
-        key_name=key_name
-    )
-    
-    worker_ids, worker_ips = create_worker_instances(
-        nbrInstances=2,
-        vpcId=vpc_id,
-        subnetId=private_subnet_id,
-        private_subnet_cidr=PRIVATE_SUBNET_CIDR,
-        public_subnet_cidr=PUBLIC_SUBNET_CIDR,
-        manager_ip=manager_ips[0],
-        key_name=key_name
-    )
-
-    proxy_id, proxy_ip = create_proxy_instance(
-        vpcId=vpc_id,
-        subnetId=private_subnet_id,
+    cluster = provision_cluster(
+        vpc_cidr=VPC_CIDR,
         public_subnet_cidr=PUBLIC_SUBNET_CIDR,
         private_subnet_cidr=PRIVATE_SUBNET_CIDR,
-        manager_ip=manager_ips[0],
-        worker_ips=worker_ips
+        availability_zone=AVAILABILITY_ZONE,
+        nbr_workers=WORKER_COUNT,
+        proxy_mode=PROXY_MODE,
+        worker_weights=WORKER_WEIGHTS,
+        gatekeeper_mode=GATEKEEPER_MODE
     )
 
-    gatekeeper_id, gatekeeper_public_ip = create_gatekeeper_instance(
-        vpcId=vpc_id,
-        subnetId=public_subnet_id,
-        private_subnet_cidr=PRIVATE_SUBNET_CIDR,
-        proxy_ip=proxy_ip,
-        key_name=key_name
-    )
+    key_name, key_path = cluster['key_pair']
+    vpc_id = cluster['vpc']
+    manager_ids, manager_ips = cluster['manager']
+    worker_ids, worker_ips = cluster['workers']
+    proxy_id, proxy_ip = cluster['proxy']
+    gatekeeper_id = cluster['gatekeeper'][0]
+    gatekeeper_public_ip = cluster['gatekeeper_public_ip']
 
     print('*'*50 + '\n')
 
@@ -984,9 +1124,16 @@ def main():
 
     print('*'*16 + ' BENCHMARKING ' + '*'*20)
 
-    print('- Waiting 3 min for the sysbench to finish...')
-
-    time.sleep(180)
+    if not wait_for_cluster_ready(
+        gatekeeper_ip=gatekeeper_public_ip,
+        proxy_ip=proxy_ip,
+        manager_ip=manager_ips[0],
+        worker_ips=worker_ips,
+        key_path=key_path
+    ):
+        print('- Cluster never became ready, cleaning up without benchmarking')
+        cleanup_all_resources(EC2_CLIENT, vpc_id=vpc_id, key_name=key_name)
+        sys.exit(1)
 
     collect_sysbench(
         gatekeeper_ip=gatekeeper_public_ip,
@@ -999,21 +1146,45 @@ def main():
         gatekeeper_ip=gatekeeper_public_ip,
         manager_ip=manager_ips[0],
         worker_ips=worker_ips,
-        api_key="test-api-key"
+        api_key="test-api-key",
+        concurrency=BENCHMARK_CONCURRENCY,
+        rate=BENCHMARK_RATE,
+        response_format=BENCHMARK_FORMAT
     )
 
-    strategies = ['direct', 'random', 'customized']
+    scaling_results = run_scaling_benchmark(
+        gatekeeper_ip=gatekeeper_public_ip,
+        api_key="test-api-key",
+        concurrency_levels=BENCHMARK_SCALING_LEVELS
+    )
+
+    worker_results = run_worker_scaling_benchmark(
+        gatekeeper_ip=gatekeeper_public_ip,
+        set_workers=lambda workers: set_service_workers(gatekeeper_public_ip, proxy_ip, key_path, workers),
+        api_key="test-api-key",
+        worker_counts=BENCHMARK_WORKER_COUNTS,
+        concurrency=max(BENCHMARK_SCALING_LEVELS)
+    )
+
+    run_batch_benchmark(
+        gatekeeper_ip=gatekeeper_public_ip,
+        api_key="test-api-key",
+        batch_sizes=BENCHMARK_BATCH_SIZES
+    )
+
+    strategies = ['direct', 'random', 'customized', 'lag_aware', 'least_outstanding']
 
     visualize_sysbench_results()
     visualize_cluster_benchmark(results, strategies)
+    visualize_latency_cdf(results, strategies)
+    visualize_latency_breakdown(results, strategies)
+    visualize_throughput_scaling(scaling_results)
+    visualize_worker_scaling(worker_results)
 
     print('*'*50 + '\n')
 
     print('*'*16 + ' CLEANUP SCRIPT ' + '*'*18)
 
-    print('- Cleanup will start in 2 min...')
-
-    time.sleep(120)
     cleanup_all_resources(EC2_CLIENT, vpc_id=vpc_id, key_name=key_name)
 
     print('*'*50 + '\n')
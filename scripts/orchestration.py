@@ -0,0 +1,30 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+def run_dependency_graph(steps, max_workers=8):
+    results = {}
+    pending = dict(steps)
+    running = {}
+    start = time.time()
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    try:
+        while pending or running:
+            for name, (dependencies, step) in list(pending.items()):
+                if all(dependency in results for dependency in dependencies):
+                    running[executor.submit(step, results)] = name
+                    del pending[name]
+
+            if not running:
+                raise RuntimeError(f'Unresolvable steps: {sorted(pending)}')
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                results[name] = future.result()
+                print(f'- Step {name} done at {time.time() - start:.1f}s')
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return results
@@ -0,0 +1,134 @@
+import random
+import requests
+import time
+from benchmark import run_ssh_command, setup_ssh_key_on_gatekeeper
+
+
+"""
+Polling
+"""
+def poll_until(check, description, timeout=900, initial_delay=2, max_delay=20, backoff=2):
+    print(f'- Waiting for {description}')
+    start = time.time()
+    delay = initial_delay
+    attempts = 0
+
+    while True:
+        attempts += 1
+        try:
+            ready = check()
+        except Exception:
+            ready = False
+
+        elapsed = time.time() - start
+        if ready:
+            print(f'- {description} ready after {elapsed:.0f}s ({attempts} checks)')
+            return True
+
+        if elapsed + delay > timeout:
+            print(f'- ERROR: {description} not ready after {elapsed:.0f}s ({attempts} checks)')
+            return False
+
+        time.sleep(delay * random.uniform(0.5, 1))
+        delay = min(delay * backoff, max_delay)
+
+
+"""
+Readiness Checks
+"""
+def run_via_gatekeeper(gatekeeper_ip, node_ip, command, key_path):
+    cmd = f'ssh -i ~/mysql-cluster-key.pem -o StrictHostKeyChecking=no -o ConnectTimeout=10 ubuntu@{node_ip} "{command}"'
+    return run_ssh_command(gatekeeper_ip, cmd, key_path, timeout=30)
+
+
+def gatekeeper_healthy(gatekeeper_ip):
+    return requests.get(f'http://{gatekeeper_ip}:8080/health', timeout=5).status_code == 200
+
+
+def setup_marker_present(gatekeeper_ip, node_ip, marker, key_path):
+    returncode, _, _ = run_via_gatekeeper(gatekeeper_ip, node_ip, f'test -f {marker}', key_path)
+    return returncode == 0
+
+
+def proxy_healthy(gatekeeper_ip, proxy_ip, key_path):
+    returncode, _, _ = run_ssh_command(gatekeeper_ip, f'curl -sf -m 5 http://{proxy_ip}:5000/health', key_path)
+    return returncode == 0
+
+
+def get_replica_lag(gatekeeper_ip, worker_ip, key_path):
+    returncode, stdout, _ = run_via_gatekeeper(
+        gatekeeper_ip, worker_ip, "mysql -u root -pRoot123! -e 'SHOW SLAVE STATUS\\G' 2>/dev/null", key_path
+    )
+    if returncode != 0:
+        return None
+
+    status = dict(line.strip().split(': ', 1) for line in stdout.splitlines() if ': ' in line)
+    if status.get('Slave_IO_Running') != 'Yes' or status.get('Slave_SQL_Running') != 'Yes':
+        return None
+
+    lag = status.get('Seconds_Behind_Master', 'NULL')
+    return int(lag) if lag.isdigit() else None
+
+
+def replica_caught_up(gatekeeper_ip, worker_ip, key_path, max_lag=0):
+    lag = get_replica_lag(gatekeeper_ip, worker_ip, key_path)
+    return lag is not None and lag <= max_lag
+
+
+"""
+Service Workers
+"""
+def workers_command(service, variable, workers):
+    drop_in = f'/etc/systemd/system/{service}.service.d/workers.conf'
+    if workers:
+        configure = f"sudo mkdir -p {drop_in.rsplit('/', 1)[0]} && printf '[Service]\\nEnvironment={variable}={workers}\\n' | sudo tee {drop_in} >/dev/null"
+    else:
+        configure = f'sudo rm -f {drop_in}'
+    return f'{configure} && sudo systemctl daemon-reload && sudo systemctl restart {service} && nproc'
+
+
+def set_service_workers(gatekeeper_ip, proxy_ip, key_path, workers=None):
+    print(f"- Restarting proxy and gatekeeper with {workers or 'nproc'} worker(s)")
+    returncode, proxy_nproc, _ = run_via_gatekeeper(gatekeeper_ip, proxy_ip, workers_command('proxy', 'PROXY_WORKERS', workers), key_path)
+    if returncode != 0:
+        return None
+
+    returncode, gatekeeper_nproc, _ = run_ssh_command(gatekeeper_ip, workers_command('gatekeeper', 'GATEKEEPER_WORKERS', workers), key_path)
+    if returncode != 0:
+        return None
+
+    if not (poll_until(lambda: proxy_healthy(gatekeeper_ip, proxy_ip, key_path), 'proxy /health', timeout=120) and
+            poll_until(lambda: gatekeeper_healthy(gatekeeper_ip), 'gatekeeper /health', timeout=120)):
+        return None
+
+    return {'proxy': workers or int(proxy_nproc.strip()), 'gatekeeper': workers or int(gatekeeper_nproc.strip())}
+
+
+"""
+Cluster Readiness
+"""
+def wait_for_cluster_ready(gatekeeper_ip, proxy_ip, manager_ip, worker_ips, key_path, timeout=1800, max_lag=0):
+    print('\n- Waiting for the cluster to be ready')
+    deadline = time.time() + timeout
+
+    def remaining():
+        return max(deadline - time.time(), 0)
+
+    checks = [
+        ('gatekeeper /health', lambda: gatekeeper_healthy(gatekeeper_ip)),
+        ('SSH key on gatekeeper', lambda: setup_ssh_key_on_gatekeeper(gatekeeper_ip, key_path)),
+        ('manager setup', lambda: setup_marker_present(gatekeeper_ip, manager_ip, '/tmp/manager_setup_complete', key_path)),
+        *[(f'worker-{i} setup', lambda ip=ip: setup_marker_present(gatekeeper_ip, ip, '/tmp/worker_setup_complete', key_path))
+          for i, ip in enumerate(worker_ips, 1)],
+        ('proxy /health', lambda: proxy_healthy(gatekeeper_ip, proxy_ip, key_path)),
+        *[(f'worker-{i} replication catch-up', lambda ip=ip: replica_caught_up(gatekeeper_ip, ip, key_path, max_lag))
+          for i, ip in enumerate(worker_ips, 1)]
+    ]
+
+    start = time.time()
+    for description, check in checks:
+        if not poll_until(check, description, timeout=remaining()):
+            return False
+
+    print(f'- Cluster ready after {time.time() - start:.0f}s')
+    return True
@@ -0,0 +1,224 @@
+import argparse
+import json
+import requests
+import time
+import main
+from benchmark import run_ssh_command, setup_ssh_key_on_gatekeeper
+from readiness import poll_until, setup_marker_present, replica_caught_up
+
+
+"""
+Proxy Admin API
+"""
+class HttpProxyAdmin:
+    def __init__(self, base_url, token=''):
+        self.base_url = base_url.rstrip('/')
+        self.headers = {'X-Admin-Token': token}
+
+    def list_workers(self):
+        response = requests.get(f'{self.base_url}/admin/workers', headers=self.headers, timeout=10)
+        response.raise_for_status()
+        return response.json()['workers']
+
+    def register(self, host, weight=None):
+        payload = {'host': host} if weight is None else {'host': host, 'weight': weight}
+        response = requests.post(f'{self.base_url}/admin/workers', json=payload, headers=self.headers, timeout=10)
+        response.raise_for_status()
+
+    def deregister(self, host):
+        response = requests.delete(f'{self.base_url}/admin/workers/{host}', headers=self.headers, timeout=10)
+        if response.status_code != 404:
+            response.raise_for_status()
+
+
+class GatekeeperProxyAdmin:
+    def __init__(self, gatekeeper_ip, proxy_ip, key_path, token=''):
+        self.gatekeeper_ip = gatekeeper_ip
+        self.proxy_ip = proxy_ip
+        self.key_path = key_path
+        self.token = token
+
+    def _call(self, method, path, payload=None):
+        body = f" -H 'Content-Type: application/json' -d '{json.dumps(payload)}'" if payload else ''
+        command = f"curl -s -m 10 -X {method} -H 'X-Admin-Token: {self.token}'{body} http://{self.proxy_ip}:5000{path}"
+        returncode, stdout, stderr = run_ssh_command(self.gatekeeper_ip, command, self.key_path)
+        if returncode != 0:
+            raise RuntimeError(f'Proxy admin call {method} {path} failed: {stderr}')
+        return json.loads(stdout)
+
+    def list_workers(self):
+        return self._call('GET', '/admin/workers')['workers']
+
+    def register(self, host, weight=None):
+        payload = {'host': host} if weight is None else {'host': host, 'weight': weight}
+        response = self._call('POST', '/admin/workers', payload)
+        if not response.get('success'):
+            raise RuntimeError(f'Could not register worker {host}: {response.get("error")}')
+
+    def deregister(self, host):
+        self._call('DELETE', f'/admin/workers/{host}')
+
+
+"""
+Worker Capacity
+"""
+class Ec2Workers:
+    def __init__(self, cluster, key_path, ready_timeout=1200):
+        self.cluster = cluster
+        self.key_path = key_path
+        self.ready_timeout = ready_timeout
+
+    def launch(self, count):
+        instance_ids, instance_ips = main.create_worker_instances(
+            nbrInstances=count,
+            vpcId=self.cluster['vpc_id'],
+            subnetId=self.cluster['private_subnet_id'],
+            private_subnet_cidr=self.cluster['private_subnet_cidr'],
+            public_subnet_cidr=self.cluster['public_subnet_cidr'],
+            manager_ip=self.cluster['manager_ip'],
+            key_name=self.cluster['key_name'],
+            security_group_id=self.cluster['worker_sg'],
+            wait_until_running=False
+        )
+        self.cluster['workers'].update(zip(instance_ips, instance_ids))
+        main.wait_for_instance_running(instance_ids)
+        return instance_ips
+
+    def wait_ready(self, hosts):
+        gatekeeper_ip = self.cluster['gatekeeper_ip']
+        return all(
+            poll_until(
+                lambda ip=ip: setup_marker_present(gatekeeper_ip, ip, '/tmp/worker_setup_complete', self.key_path)
+                and replica_caught_up(gatekeeper_ip, ip, self.key_path),
+                f'worker {ip} setup and replication catch-up',
+                timeout=self.ready_timeout
+            )
+            for ip in hosts
+        )
+
+    def terminate(self, hosts):
+        instance_ids = [self.cluster['workers'].pop(host) for host in hosts if host in self.cluster['workers']]
+        if instance_ids:
+            print(f'- Terminating worker instances: {instance_ids}')
+            main.EC2_CLIENT.terminate_instances(InstanceIds=instance_ids)
+
+
+class LocalWorkers:
+    def __init__(self, hosts):
+        self.available = list(hosts)
+
+    def launch(self, count):
+        if count > len(self.available):
+            raise ValueError(f'Only {len(self.available)} local worker hosts left, {count} requested')
+        launched, self.available = self.available[:count], self.available[count:]
+        print(f'- Using local worker hosts: {launched}')
+        return launched
+
+    def wait_ready(self, hosts):
+        return True
+
+    def terminate(self, hosts):
+        self.available.extend(hosts)
+
+
+def scale_workers(target, workers, admin, drain_seconds=5):
+    if target < 0:
+        raise ValueError('Worker count cannot be negative')
+
+    current = admin.list_workers()
+    print(f'- Scaling workers from {len(current)} to {target}')
+
+    if target > len(current):
+        hosts = workers.launch(target - len(current))
+        if not workers.wait_ready(hosts):
+            print(f'- Workers {hosts} never became ready, terminating them')
+            workers.terminate(hosts)
+            return admin.list_workers()
+        for host in hosts:
+            admin.register(host)
+            print(f'- Registered worker {host} with the proxy')
+
+    elif target < len(current):
+        hosts = current[target:]
+        for host in hosts:
+            admin.deregister(host)
+            print(f'- Deregistered worker {host} from the proxy')
+        time.sleep(drain_seconds)
+        workers.terminate(hosts)
+
+    workers_now = admin.list_workers()
+    print(f'- Proxy workers: {workers_now}')
+    return workers_now
+
+
+"""
+Cluster Discovery
+"""
+def get_name_tag(resource):
+    return next((tag['Value'] for tag in resource.get('Tags', []) if tag['Key'] == 'Name'), '')
+
+
+def discover_cluster(vpc_name='mysql-cluster-vpc', key_name='mysql-cluster-key'):
+    print(f'- Discovering cluster in VPC: {vpc_name}')
+    vpcs = main.EC2_CLIENT.describe_vpcs(Filters=[{'Name': 'tag:Name', 'Values': [vpc_name]}])['Vpcs']
+    if not vpcs:
+        raise RuntimeError(f'No VPC found with name: {vpc_name}')
+    vpc_id = vpcs[0]['VpcId']
+    vpc_filter = {'Name': 'vpc-id', 'Values': [vpc_id]}
+
+    subnets = {get_name_tag(subnet): subnet for subnet in main.EC2_CLIENT.describe_subnets(Filters=[vpc_filter])['Subnets']}
+    worker_sg = main.EC2_CLIENT.describe_security_groups(
+        Filters=[vpc_filter, {'Name': 'group-name', 'Values': ['worker-sg']}]
+    )['SecurityGroups'][0]['GroupId']
+
+    paginator = main.EC2_CLIENT.get_paginator('describe_instances')
+    instances = [
+        instance
+        for page in paginator.paginate(Filters=[vpc_filter, {'Name': 'instance-state-name', 'Values': ['pending', 'running']}])
+        for reservation in page['Reservations']
+        for instance in reservation['Instances']
+    ]
+    main.cache_instances(instances)
+
+    def by_name(name):
+        return [instance for instance in instances if get_name_tag(instance) == name]
+
+    return {
+        'vpc_id': vpc_id,
+        'private_subnet_id': subnets['private-subnet']['SubnetId'],
+        'private_subnet_cidr': subnets['private-subnet']['CidrBlock'],
+        'public_subnet_cidr': subnets['public-subnet']['CidrBlock'],
+        'worker_sg': worker_sg,
+        'key_name': key_name,
+        'manager_ip': by_name('mysql-manager')[0]['PrivateIpAddress'],
+        'proxy_ip': by_name('proxy-trusted-host')[0]['PrivateIpAddress'],
+        'gatekeeper_ip': by_name('gatekeeper')[0].get('PublicIpAddress', ''),
+        'workers': {instance['PrivateIpAddress']: instance['InstanceId'] for instance in by_name('mysql-worker')}
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Scale the MySQL read replicas behind the proxy')
+    parser.add_argument('workers', type=int, help='target number of worker replicas')
+    parser.add_argument('--vpc-name', default='mysql-cluster-vpc')
+    parser.add_argument('--key-name', default='mysql-cluster-key')
+    parser.add_argument('--token', help='proxy admin token (defaults to the one saved next to the key at deploy time)')
+    parser.add_argument('--local', metavar='PROXY_URL', help='scale a locally running proxy instead of AWS')
+    parser.add_argument('--hosts', default='', help='comma-separated worker hosts available to --local')
+    args = parser.parse_args()
+    token = args.token or main.read_admin_token(args.key_name)
+
+    if args.local:
+        scale_workers(args.workers, LocalWorkers([host for host in args.hosts.split(',') if host]), HttpProxyAdmin(args.local, token))
+    else:
+        main.validateAWSCredentials()
+        main.setBoto3Clients()
+        key_path = f'{args.key_name}.pem'
+        cluster = discover_cluster(args.vpc_name, args.key_name)
+        if not setup_ssh_key_on_gatekeeper(cluster['gatekeeper_ip'], key_path):
+            raise SystemExit(1)
+        scale_workers(
+            args.workers,
+            Ec2Workers(cluster, key_path),
+            GatekeeperProxyAdmin(cluster['gatekeeper_ip'], cluster['proxy_ip'], key_path, token)
+        )
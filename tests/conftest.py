@@ -0,0 +1,19 @@
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+
+@pytest.fixture
+def ec2(tmp_path, monkeypatch):
+    from moto import mock_aws
+    import main
+    monkeypatch.chdir(tmp_path)
+    for name, value in [('AWS_ACCESS_KEY_ID', 'testing'), ('AWS_SECRET_ACCESS_KEY', 'testing'), ('AWS_DEFAULT_REGION', 'us-east-1')]:
+        monkeypatch.setenv(name, value)
+    monkeypatch.delenv('AWS_SESSION_TOKEN', raising=False)
+    with mock_aws():
+        main.setBoto3Clients()
+        main.INSTANCE_INVENTORY.clear()
+        yield main.EC2_CLIENT
@@ -0,0 +1,93 @@
+import os
+import re
+import time
+import pytest
+
+TEMPLATE = os.path.join(os.path.dirname(__file__), '..', 'user-data', 'proxy.tpl')
+
+
+def load_classifier():
+    with open(TEMPLATE) as f:
+        source = f.read()
+    start = source.index('READ_KEYWORDS = ')
+    end = source.index('def is_host_failure(')
+    namespace = {'re': re}
+    exec(source[start:end], namespace)
+    return namespace['is_read_query']
+
+
+is_read_query = load_classifier()
+
+CLASSIFIER_CORPUS = [
+    ('SELECT * FROM actor LIMIT 10', True),
+    ('  select 1', True),
+    ('SHOW TABLES', True),
+    ('DESCRIBE actor', True),
+    ('DESC actor', True),
+    ('EXPLAIN SELECT * FROM film', True),
+    ('TABLE actor', True),
+    ('(SELECT 1) UNION (SELECT 2)', True),
+    ('-- comment\nSELECT 1', True),
+    ('# comment\nSELECT 1', True),
+    ('/* comment */ SELECT 1', True),
+    ('/* multi\nline */ -- another\n  SELECT 1', True),
+    ('WITH recent AS (SELECT * FROM rental) SELECT * FROM recent', True),
+    ('WITH RECURSIVE n (x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n WHERE x < 5) SELECT * FROM n', True),
+    ("WITH a AS (SELECT ')' AS p), b AS (SELECT * FROM a) SELECT * FROM b", True),
+    ('WITH a AS (SELECT 1) UPDATE actor SET first_name = (SELECT 1 FROM a)', False),
+    ('WITH a AS (SELECT 1) DELETE FROM actor WHERE actor_id IN (SELECT * FROM a)', False),
+    ('SELECT * FROM actor WHERE actor_id = 1 FOR UPDATE', False),
+    ('SELECT * FROM actor FOR SHARE', False),
+    ('SELECT * FROM actor LOCK IN SHARE MODE', False),
+    ('SELECT * FROM actor FOR UPDATE /* ' + 'x' * 1000 + ' */', False),
+    ('SELECT * FROM actor FOR UPDATE -- ' + 'x' * 1000, False),
+    ('SELECT * FROM actor /*!50000 FOR UPDATE */', False),
+    ('SELECT * FROM actor /* FOR UPDATE */', True),
+    ('SELECT * FROM actor FOR UPDATE /* ' + 'x' * 300 + ' */ /* ' + 'y' * 300 + ' */', False),
+    ('SELECT * FROM actor FOR UPDATE -- ' + 'x' * 300 + '\n-- ' + 'y' * 300, False),
+    ('SELECT * FROM actor FOR UPDATE /* ' + 'x' * 300 + ' */ NOWAIT', False),
+    ("SELECT * FROM rental WHERE rental_date > '2005-05-01' AND note = '" + '-' * 300 + "'", True),
+    ('SELECT * FROM rental WHERE rental_id IN (' + ', '.join(str(i) for i in range(100)) + ') -- FOR UPDATE', True),
+    ('SELECT 1;', True),
+    ('SELECT 1; -- trailing comment', True),
+    ('SELECT 1; DELETE FROM actor', False),
+    ('SELECT 1;; DELETE FROM actor', False),
+    ('SELECT 1; ; DELETE FROM actor', False),
+    ('SELECT 1; /* c */; DELETE FROM actor', False),
+    ("SELECT 'a;b' FROM actor", True),
+    ('SELECT "x; DROP TABLE actor" FROM actor', True),
+    ("INSERT INTO actor (first_name, last_name, last_update) VALUES ('Benchmark', 'Test', NOW())", False),
+    ('UPDATE actor SET first_name = 1', False),
+    ('/* SELECT */ DELETE FROM actor WHERE actor_id = 1', False),
+    ('REPLACE INTO actor VALUES (1)', False),
+    ('CALL refresh()', False),
+    ('CREATE TABLE t (id INT)', False),
+    ('SELECTED', False),
+    ('', False),
+    ('   ', False),
+    ('-- only a comment', False),
+]
+
+
+@pytest.mark.parametrize('query, expected', CLASSIFIER_CORPUS)
+def test_classifier(query, expected):
+    assert is_read_query(query) == expected
+
+
+def run_classifier_benchmark(iterations=100000):
+    large_query = 'SELECT * FROM rental WHERE rental_id IN (' + ', '.join(str(i) for i in range(20000)) + ')'
+    date_query = 'SELECT * FROM rental WHERE rental_date IN (' + ', '.join(f"'2005-05-{i % 28 + 1:02d}'" for i in range(20000)) + ')'
+    for name, query, count in [('short read', 'SELECT * FROM actor LIMIT 10', iterations),
+                               ('short write', "INSERT INTO actor (first_name) VALUES ('Benchmark')", iterations),
+                               ('CTE', 'WITH a AS (SELECT 1) SELECT * FROM a', iterations),
+                               ('commented read', '/* api */ SELECT * FROM actor -- list', iterations),
+                               (f'large read ({len(large_query)} chars)', large_query, iterations // 100),
+                               (f'large read with dates ({len(date_query)} chars)', date_query, iterations // 100)]:
+        start = time.perf_counter()
+        for _ in range(count): is_read_query(query)
+        elapsed = time.perf_counter() - start
+        print(f'{name}: {elapsed / count * 1e6:.2f} us/call')
+
+
+if __name__ == '__main__':
+    run_classifier_benchmark()
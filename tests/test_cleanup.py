@@ -0,0 +1,41 @@
+import os
+from botocore.exceptions import ClientError
+import cleanup
+import main
+
+
+class FlakyVpcDeletes:
+    def __init__(self, client):
+        self.client = client
+        self.failed = set()
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+    def delete_vpc(self, VpcId):
+        if VpcId not in self.failed:
+            self.failed.add(VpcId)
+            raise ClientError({'Error': {'Code': 'DependencyViolation', 'Message': 'still in use'}}, 'DeleteVpc')
+        return self.client.delete_vpc(VpcId=VpcId)
+
+
+def test_cleanup_all_resources(ec2, monkeypatch):
+    monkeypatch.setattr(cleanup.time, 'sleep', lambda seconds: None)
+    vpc_ids = [main.provision_cluster('10.0.0.0/16', '10.0.1.0/24', '10.0.2.0/24', 'us-east-1a', nbr_workers=1)['vpc'] for _ in range(2)]
+    assert sorted(cleanup.find_vpcs_by_name(ec2, 'mysql-cluster-vpc')) == sorted(vpc_ids)
+
+    client = FlakyVpcDeletes(ec2)
+    cleanup.cleanup_all_resources(client, vpc_name='mysql-cluster-vpc', key_name='mysql-cluster-key')
+
+    assert client.failed == set(vpc_ids)
+    assert cleanup.find_vpcs_by_name(ec2, 'mysql-cluster-vpc') == []
+    instances = [
+        instance
+        for reservation in ec2.describe_instances()['Reservations']
+        for instance in reservation['Instances']
+        if instance['State']['Name'] != 'terminated'
+    ]
+    assert instances == []
+    assert ec2.describe_key_pairs()['KeyPairs'] == []
+    assert not os.path.exists('mysql-cluster-key.pem')
+    assert not os.path.exists('mysql-cluster-key.admin-token')
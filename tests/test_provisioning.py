@@ -0,0 +1,63 @@
+import threading
+import pytest
+import main
+from orchestration import run_dependency_graph
+
+
+def test_dependency_graph_passes_results_and_rejects_cycles():
+    results = run_dependency_graph({
+        'a': ((), lambda r: 1),
+        'b': (('a',), lambda r: r['a'] + 1),
+        'c': (('a', 'b'), lambda r: r['a'] + r['b'])
+    })
+    assert results == {'a': 1, 'b': 2, 'c': 3}
+
+    with pytest.raises(RuntimeError, match='Unresolvable'):
+        run_dependency_graph({'a': (('b',), lambda r: 1), 'b': (('a',), lambda r: 2)})
+
+
+def test_provision_cluster(ec2, monkeypatch):
+    events = []
+    lock = threading.Lock()
+    graph = {}
+
+    def recorded(name, step):
+        def run(results):
+            with lock: events.append(('start', name))
+            result = step(results)
+            with lock: events.append(('end', name))
+            return result
+        return run
+
+    def recording_graph(steps, max_workers=8):
+        graph.update(steps)
+        return run_dependency_graph({name: (deps, recorded(name, step)) for name, (deps, step) in steps.items()}, max_workers)
+
+    monkeypatch.setattr(main, 'run_dependency_graph', recording_graph)
+    cluster = main.provision_cluster('10.0.0.0/16', '10.0.1.0/24', '10.0.2.0/24', 'us-east-1a', nbr_workers=2)
+
+    for name, (dependencies, _) in graph.items():
+        for dependency in dependencies:
+            assert events.index(('end', dependency)) < events.index(('start', name)), (dependency, name)
+
+    instances = [
+        instance
+        for reservation in ec2.describe_instances(Filters=[{'Name': 'vpc-id', 'Values': [cluster['vpc']]}])['Reservations']
+        for instance in reservation['Instances']
+    ]
+    names = sorted(tag['Value'] for instance in instances for tag in instance['Tags'] if tag['Key'] == 'Name')
+    assert names == ['gatekeeper', 'mysql-manager', 'mysql-worker', 'mysql-worker', 'proxy-trusted-host']
+    assert all(instance['State']['Name'] == 'running' for instance in instances)
+
+    route_tables = {
+        route_table['RouteTableId']: route_table
+        for route_table in ec2.describe_route_tables(Filters=[{'Name': 'vpc-id', 'Values': [cluster['vpc']]}])['RouteTables']
+    }
+    public_routes = route_tables[cluster['public_route_table']]
+    private_routes = route_tables[cluster['private_route_table']]
+    assert next(route for route in public_routes['Routes'] if route['DestinationCidrBlock'] == '0.0.0.0/0')['GatewayId'] == cluster['igw']
+    assert next(route for route in private_routes['Routes'] if route['DestinationCidrBlock'] == '0.0.0.0/0')['NatGatewayId'] == cluster['nat_gateway']
+    assert [association['SubnetId'] for association in public_routes['Associations']] == [cluster['public_subnet']]
+    assert [association['SubnetId'] for association in private_routes['Associations']] == [cluster['private_subnet']]
+    assert cluster['gatekeeper_public_ip']
+    assert main.read_admin_token('mysql-cluster-key') == cluster['admin_token']
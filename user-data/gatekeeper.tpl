@@ -13,7 +13,7 @@ echo "Installing Python3 and pip"
 apt-get install -y python3 python3-pip
 
 echo "Installing Python packages"
-pip3 install flask requests
+pip3 install flask requests gunicorn
 
 echo "Creating gatekeeper application directory"
 mkdir -p /opt/gatekeeper
@@ -21,15 +21,344 @@ cd /opt/gatekeeper
 
 echo "Creating gatekeeper server application"
 cat > /opt/gatekeeper/gatekeeper_server.py <<'GATEKEEPER_APP'
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify
+from requests.adapters import HTTPAdapter
+import bisect
+import collections
+import fcntl
+import functools
+import json
+import math
+import mmap
 import requests
+import struct
+import threading
+import time
 import os
+import zlib
 
 app = Flask(__name__)
 
 PROXY_HOST = '__PROXY_HOST__'
 PROXY_PORT = 5000
 PROXY_URL = f'http://{PROXY_HOST}:{PROXY_PORT}/query'
+PROXY_BATCH_URL = f'http://{PROXY_HOST}:{PROXY_PORT}/batch'
+
+RESPONSE_FORMATS = ('json', 'columnar', 'msgpack')
+
+STRATEGIES = ('direct', 'random', 'customized', 'lag_aware', 'least_outstanding')
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+METRIC_TYPES = {
+    'gatekeeper_requests_total': ('counter', 'Requests handled by endpoint, strategy and status'),
+    'gatekeeper_request_duration_seconds': ('histogram', 'Total time spent handling a request'),
+    'gatekeeper_proxy_duration_seconds': ('histogram', 'Time spent waiting for the proxy response'),
+    'gatekeeper_errors_total': ('counter', 'Responses with a 4xx or 5xx status'),
+    'gatekeeper_requests_in_flight': ('gauge', 'Requests currently being handled'),
+    'gatekeeper_proxy_connections_idle': ('gauge', 'Idle keep-alive connections to the proxy'),
+    'gatekeeper_proxy_connection_reuse_ratio': ('gauge', 'Share of proxy requests sent on a reused connection'),
+    'gatekeeper_shed_total': ('counter', 'Requests rejected by admission control or rate limiting, by reason'),
+    'gatekeeper_admission_active': ('gauge', 'Requests admitted and being forwarded'),
+    'gatekeeper_admission_queued': ('gauge', 'Requests waiting for admission')
+}
+
+WORKER_THREADS = int(os.environ.get('GATEKEEPER_THREADS', 16))
+PROXY_POOL_SIZE = int(os.environ.get('PROXY_POOL_SIZE', WORKER_THREADS))
+
+METRICS_CONFIG = {
+    'directory': os.environ.get('METRICS_DIR', '/dev/shm/gatekeeper-metrics'),
+    'flush_interval': float(os.environ.get('METRICS_FLUSH_INTERVAL', 1))
+}
+
+ADMISSION_CONFIG = {
+    'max_concurrency': int(os.environ.get('GATEKEEPER_MAX_CONCURRENCY', max(WORKER_THREADS // 2, 1))),
+    'max_queue': int(os.environ.get('GATEKEEPER_MAX_QUEUE', max(WORKER_THREADS - max(WORKER_THREADS // 2, 1), 0))),
+    'queue_timeout': float(os.environ.get('GATEKEEPER_QUEUE_TIMEOUT', 1)),
+    'request_timeout': float(os.environ.get('GATEKEEPER_REQUEST_TIMEOUT', 30)),
+    'batch_timeout': float(os.environ.get('GATEKEEPER_BATCH_TIMEOUT', 60)),
+    'service_time_alpha': 0.2
+}
+
+RATE_LIMIT_CONFIG = {
+    'rate': float(os.environ.get('RATE_LIMIT_RPS', 0)),
+    'burst': max(float(os.environ.get('RATE_LIMIT_BURST', 100)), 1),
+    'global_rate': float(os.environ.get('RATE_LIMIT_GLOBAL_RPS', 0)),
+    'global_burst': max(float(os.environ.get('RATE_LIMIT_GLOBAL_BURST', 1000)), 1),
+    'state_path': os.environ.get('RATE_LIMIT_STATE', '/dev/shm/gatekeeper-rate-limits'),
+    'slots': 65536
+}
+
+proxy_session = requests.Session()
+proxy_adapter = HTTPAdapter(pool_connections=1, pool_maxsize=PROXY_POOL_SIZE, pool_block=True)
+proxy_session.mount('http://', proxy_adapter)
+
+def get_session_stats():
+    pools = proxy_adapter.poolmanager.pools
+    connection_pools = [pools[key] for key in pools.keys()]
+    requests_sent = sum(pool.num_requests for pool in connection_pools)
+    connections_opened = sum(pool.num_connections for pool in connection_pools)
+    return {
+        'pool_size': PROXY_POOL_SIZE,
+        'idle_connections': sum(1 for pool in connection_pools if pool.pool for conn in list(pool.pool.queue) if conn),
+        'requests': requests_sent,
+        'connections_opened': connections_opened,
+        'reused_requests': max(requests_sent - connections_opened, 0),
+        'reuse_ratio': (requests_sent - connections_opened) / requests_sent if requests_sent else 0.0
+    }
+
+def format_metric_value(value):
+    if value != value: return 'NaN'
+    if value in (float('inf'), float('-inf')): return '+Inf' if value > 0 else '-Inf'
+    return repr(value)
+
+def format_labels(labels):
+    if not labels: return ''
+    return '{' + ','.join(f'{key}={json.dumps(str(value), ensure_ascii=False)}' for key, value in labels) + '}'
+
+def process_alive(pid):
+    try: os.kill(pid, 0)
+    except ProcessLookupError: return False
+    except PermissionError: return True
+    return True
+
+def metric_key(key):
+    return key[0], tuple(tuple(label) for label in key[1])
+
+class Metrics:
+    def __init__(self, types, directory, flush_interval):
+        self.types = types
+        self.values = {}
+        self.histograms = {}
+        self.lock = threading.Lock()
+        self.directory = directory
+        self.path = os.path.join(directory, f'{os.getpid()}-{time.time_ns()}.json')
+        threading.Thread(target=self._flush_loop, args=(flush_interval,), daemon=True).start()
+
+    def inc(self, name, labels=(), value=1):
+        with self.lock: self.values[(name, labels)] = self.values.get((name, labels), 0) + value
+
+    def observe(self, name, labels, value):
+        index = bisect.bisect_left(LATENCY_BUCKETS, value)
+        with self.lock:
+            histogram = self.histograms.get((name, labels))
+            if histogram is None: histogram = self.histograms[(name, labels)] = [[0] * (len(LATENCY_BUCKETS) + 1), 0.0]
+            histogram[0][index] += 1
+            histogram[1] += value
+
+    def _snapshot(self):
+        with self.lock:
+            return list(self.values.items()), [(key, list(histogram[0]), histogram[1]) for key, histogram in self.histograms.items()]
+
+    def flush(self):
+        values, histograms = self._snapshot()
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.path + '.tmp', 'w') as f: json.dump({'values': values, 'histograms': histograms}, f)
+        os.replace(self.path + '.tmp', self.path)
+
+    def _flush_loop(self, interval):
+        while True:
+            time.sleep(interval)
+            try: self.flush()
+            except OSError: pass
+
+    def _collect(self):
+        sources = [(*self._snapshot(), True)]
+        try: files = [name for name in os.listdir(self.directory) if name.endswith('.json')]
+        except OSError: files = []
+        for name in files:
+            path = os.path.join(self.directory, name)
+            if path == self.path: continue
+            try:
+                with open(path) as f: data = json.load(f)
+            except (OSError, ValueError): continue
+            sources.append(([(metric_key(key), value) for key, value in data['values']],
+                            [(metric_key(key), buckets, total) for key, buckets, total in data['histograms']],
+                            process_alive(int(name.split('-')[0]))))
+        values, histograms = {}, {}
+        for process_values, process_histograms, alive in sources:
+            for key, value in process_values:
+                if alive or self.types.get(key[0], ('counter',))[0] != 'gauge': values[key] = values.get(key, 0) + value
+            for key, buckets, total in process_histograms:
+                merged = histograms.setdefault(key, [[0] * len(buckets), 0.0])
+                merged[0] = [count + other for count, other in zip(merged[0], buckets)]
+                merged[1] += total
+        return list(values.items()), [(key, buckets, total) for key, (buckets, total) in histograms.items()]
+
+    def render(self, gauges=()):
+        values, histograms = self._collect()
+        pid = (('pid', str(os.getpid())),)
+        series = collections.defaultdict(list)
+        for (name, labels), value in values + [((name, labels + pid), value) for (name, labels), value in gauges]:
+            series[name].append(f'{name}{format_labels(labels)} {format_metric_value(value)}')
+        for (name, labels), buckets, total in histograms:
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS + (float('inf'),), buckets):
+                cumulative += count
+                series[name].append(f"{name}_bucket{format_labels(labels + (('le', format_metric_value(bound)),))} {cumulative}")
+            series[name].append(f'{name}_sum{format_labels(labels)} {format_metric_value(total)}')
+            series[name].append(f'{name}_count{format_labels(labels)} {cumulative}')
+        lines = []
+        for name, (kind, description) in self.types.items():
+            lines += [f'# HELP {name} {description}', f'# TYPE {name} {kind}'] + series.get(name, [])
+        return '\n'.join(lines) + '\n'
+
+metrics = Metrics(METRIC_TYPES, METRICS_CONFIG['directory'], METRICS_CONFIG['flush_interval'])
+
+def format_server_timing(timings, prefix=''):
+    return ', '.join(f'{prefix}{name};dur={duration * 1000:.3f}' for name, duration in timings.items())
+
+def request_endpoint(request):
+    return request.url_rule.rule if request.url_rule else 'unknown'
+
+def post_to_proxy(url, **kwargs):
+    start = time.perf_counter()
+    try:
+        proxy_response = proxy_session.post(url, **kwargs)
+        g.proxy_server_timing = proxy_response.headers.get('Server-Timing', '')
+        return proxy_response
+    finally:
+        g.server_timing['forward'] = time.perf_counter() - start
+        metrics.observe('gatekeeper_proxy_duration_seconds', (('endpoint', request_endpoint(request)),), g.server_timing['forward'])
+
+def relay_server_timing(header):
+    return ', '.join(f'proxy-{entry.strip()}' for entry in header.split(',') if entry.strip())
+
+class AdmissionController:
+    def __init__(self):
+        self.active = 0
+        self.queued = 0
+        self.service_time = 0.01
+        self.cond = threading.Condition()
+        self.stats = {'admitted': 0, 'queued': 0, 'shed_queue_full': 0, 'shed_deadline': 0}
+
+    def _retry_after(self):
+        return max(math.ceil((self.queued + 1) * self.service_time / ADMISSION_CONFIG['max_concurrency']), 1)
+
+    def acquire(self, budget):
+        with self.cond:
+            if self.active < ADMISSION_CONFIG['max_concurrency'] and self.queued == 0:
+                self.active += 1
+                self.stats['admitted'] += 1
+                return None
+            if self.queued >= ADMISSION_CONFIG['max_queue']:
+                self.stats['shed_queue_full'] += 1
+                return 'queue_full', self._retry_after()
+            if (self.queued + 1) * self.service_time / ADMISSION_CONFIG['max_concurrency'] > budget:
+                self.stats['shed_deadline'] += 1
+                return 'deadline', self._retry_after()
+            self.queued += 1
+            self.stats['queued'] += 1
+            deadline = time.monotonic() + budget
+            try:
+                while self.active >= ADMISSION_CONFIG['max_concurrency']:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.stats['shed_deadline'] += 1
+                        return 'deadline', self._retry_after()
+                    self.cond.wait(remaining)
+                self.active += 1
+                self.stats['admitted'] += 1
+                return None
+            finally:
+                self.queued -= 1
+
+    def release(self, elapsed):
+        with self.cond:
+            self.active -= 1
+            alpha = ADMISSION_CONFIG['service_time_alpha']
+            self.service_time = alpha * elapsed + (1 - alpha) * self.service_time
+            self.cond.notify()
+
+    def get_stats(self):
+        with self.cond:
+            return {**self.stats, 'active': self.active, 'queued_now': self.queued, 'service_time': self.service_time,
+                    'max_concurrency': ADMISSION_CONFIG['max_concurrency'], 'max_queue': ADMISSION_CONFIG['max_queue']}
+
+class RateLimiter:
+    def __init__(self, path, slots):
+        self.path = path
+        self.slots = slots
+        self.map = None
+        self.lock = threading.Lock()
+
+    def _open(self):
+        if self.map is None:
+            self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            if os.fstat(self.fd).st_size < self.slots * 16: os.ftruncate(self.fd, self.slots * 16)
+            self.map = mmap.mmap(self.fd, self.slots * 16)
+        return self.map
+
+    def _limits(self, api_key):
+        limits = [(1 + zlib.crc32(api_key.encode()) % (self.slots - 1), RATE_LIMIT_CONFIG['rate'], RATE_LIMIT_CONFIG['burst']),
+                  (0, RATE_LIMIT_CONFIG['global_rate'], RATE_LIMIT_CONFIG['global_burst'])]
+        return [(slot, rate, burst) for slot, rate, burst in limits if rate > 0]
+
+    def _tokens(self, buckets, slot, rate, burst, now):
+        tokens, updated = struct.unpack_from('dd', buckets, slot * 16)
+        return burst if not updated else min(tokens + (now - updated) * rate, burst)
+
+    def consume(self, api_key):
+        limits = self._limits(api_key)
+        if not limits: return 0
+        with self.lock:
+            buckets = self._open()
+            fcntl.flock(self.fd, fcntl.LOCK_EX)
+            try:
+                now = time.monotonic()
+                tokens = [self._tokens(buckets, slot, rate, burst, now) for slot, rate, burst in limits]
+                retry_after = max([math.ceil((1 - available) / rate) for available, (_, rate, _) in zip(tokens, limits) if available < 1], default=0)
+                for (slot, _, _), available in zip(limits, tokens):
+                    struct.pack_into('dd', buckets, slot * 16, available if retry_after else available - 1, now)
+                return retry_after
+            finally:
+                fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+    def get_stats(self):
+        return dict(RATE_LIMIT_CONFIG)
+
+admission = AdmissionController()
+rate_limiter = RateLimiter(RATE_LIMIT_CONFIG['state_path'], RATE_LIMIT_CONFIG['slots'])
+
+def request_budget():
+    budget = ADMISSION_CONFIG['batch_timeout' if request.path == '/batch' else 'request_timeout']
+    deadline_ms = request.headers.get('X-Deadline-Ms', '')
+    if deadline_ms.isdigit(): budget = min(budget, int(deadline_ms) / 1000)
+    return budget
+
+def remaining_budget():
+    return max(g.request_deadline - time.monotonic(), 0.001)
+
+def shed_response(status, reason, message, retry_after):
+    metrics.inc('gatekeeper_shed_total', (('reason', reason),))
+    response = jsonify({'success': False, 'error': message, 'retry_after': retry_after})
+    response.headers['Retry-After'] = str(retry_after)
+    return response, status
+
+def admission_controlled(handler):
+    @functools.wraps(handler)
+    def wrapper(*args, **kwargs):
+        api_key = request.headers.get('X-API-Key', '')
+        if api_key:
+            retry_after = rate_limiter.consume(api_key)
+            if retry_after: return shed_response(429, 'rate_limit', 'Rate limit exceeded for this API key', retry_after)
+        budget = request_budget()
+        g.request_deadline = time.monotonic() + budget
+        rejection = admission.acquire(min(budget, ADMISSION_CONFIG['queue_timeout']))
+        if rejection:
+            reason, retry_after = rejection
+            return shed_response(503, reason, 'Gatekeeper overloaded - retry later', retry_after)
+        start = time.perf_counter()
+        release = lambda: admission.release(time.perf_counter() - start)
+        try:
+            response = handler(*args, **kwargs)
+        except BaseException:
+            release()
+            raise
+        if isinstance(response, Response) and response.is_streamed: response.call_on_close(release)
+        else: release()
+        return response
+    return wrapper
 
 def is_authenticated(request):
     api_key = request.headers.get('X-API-Key', '')
@@ -39,14 +368,70 @@ def is_authenticated(request):
     
     return True
 
+def relay_stream(proxy_response):
+    try:
+        for chunk in proxy_response.iter_content(chunk_size=None):
+            yield chunk
+    finally:
+        proxy_response.close()
+
+@app.before_request
+def start_request_metrics():
+    g.request_start = time.perf_counter()
+    g.server_timing = {}
+    metrics.inc('gatekeeper_requests_in_flight')
+
+@app.after_request
+def record_request_metrics(response):
+    endpoint = request_endpoint(request)
+    timing = format_server_timing({**g.server_timing, 'total': time.perf_counter() - g.request_start})
+    proxy_timing = relay_server_timing(g.get('proxy_server_timing', ''))
+    response.headers['Server-Timing'] = f'{timing}, {proxy_timing}' if proxy_timing else timing
+    if request.method == 'POST':
+        data = request.get_json(silent=True) or {}
+        strategy = data.get('strategy', 'direct') if isinstance(data, dict) else 'direct'
+        labels = (('endpoint', endpoint), ('strategy', strategy if strategy in STRATEGIES else 'other'))
+        metrics.inc('gatekeeper_requests_total', labels + (('status', str(response.status_code)),))
+        metrics.observe('gatekeeper_request_duration_seconds', labels, time.perf_counter() - g.request_start)
+    if response.status_code >= 400:
+        metrics.inc('gatekeeper_errors_total', (('endpoint', endpoint), ('status', str(response.status_code))))
+    return response
+
+@app.teardown_request
+def finish_request_metrics(error=None):
+    metrics.inc('gatekeeper_requests_in_flight', value=-1)
+    if error is not None: metrics.inc('gatekeeper_errors_total', (('endpoint', request_endpoint(request)), ('status', '500')))
+
 @app.route('/health', methods=['GET'])
 def health():
     return jsonify({'status': 'healthy', 'service': 'gatekeeper'}), 200
 
+@app.route('/session/stats', methods=['GET'])
+def session_stats():
+    return jsonify(get_session_stats()), 200
+
+@app.route('/admission/stats', methods=['GET'])
+def admission_stats():
+    return jsonify({**admission.get_stats(), 'rate_limit': rate_limiter.get_stats()}), 200
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    session = get_session_stats()
+    admission_state = admission.get_stats()
+    gauges = [(('gatekeeper_proxy_connections_idle', ()), session['idle_connections']),
+              (('gatekeeper_proxy_connection_reuse_ratio', ()), session['reuse_ratio']),
+              (('gatekeeper_admission_active', ()), admission_state['active']),
+              (('gatekeeper_admission_queued', ()), admission_state['queued_now'])]
+    return Response(metrics.render(gauges), mimetype='text/plain; version=0.0.4')
+
 @app.route('/query', methods=['POST'])
+@admission_controlled
 def handle_request():
     try:
-        if not is_authenticated(request):
+        auth_start = time.perf_counter()
+        authenticated = is_authenticated(request)
+        g.server_timing['auth'] = time.perf_counter() - auth_start
+        if not authenticated:
             return jsonify({
                 'success': False,
                 'error': 'Authentication failed - API key required'
@@ -60,7 +445,10 @@ def handle_request():
             }), 400
         
         query = data.get('query', '')
+        params = data.get('params')
         strategy = data.get('strategy', 'direct')
+        stream = bool(data.get('stream', False))
+        response_format = data.get('format', 'json')
         
         if not query:
             return jsonify({
@@ -68,14 +456,107 @@ def handle_request():
                 'error': 'No query provided'
             }), 400
         
+        if response_format not in RESPONSE_FORMATS:
+            return jsonify({
+                'success': False,
+                'error': f'Unsupported format - expected one of {list(RESPONSE_FORMATS)}'
+            }), 400
+        
+        if params is not None and not isinstance(params, list):
+            return jsonify({
+                'success': False,
+                'error': 'Invalid params - expected a list'
+            }), 400
+        
         try:
-            proxy_response = requests.post(
+            proxy_response = post_to_proxy(
                 PROXY_URL,
-                json={'query': query, 'strategy': strategy},
-                timeout=30
+                json={'query': query, 'params': params, 'strategy': strategy, 'stream': stream, 'format': response_format},
+                timeout=remaining_budget(),
+                stream=stream
             )
             
-            return jsonify(proxy_response.json()), proxy_response.status_code
+            if stream:
+                return Response(
+                    relay_stream(proxy_response),
+                    status=proxy_response.status_code,
+                    content_type=proxy_response.headers.get('Content-Type', 'application/json')
+                )
+            
+            if response_format != 'json':
+                return Response(
+                    proxy_response.content,
+                    status=proxy_response.status_code,
+                    content_type=proxy_response.headers.get('Content-Type', 'application/json')
+                )
+            
+            serialise_start = time.perf_counter()
+            response = jsonify(proxy_response.json())
+            g.server_timing['serialise'] = time.perf_counter() - serialise_start
+            return response, proxy_response.status_code
+        
+        except requests.exceptions.RequestException as e:
+            return jsonify({
+                'success': False,
+                'error': 'Failed to communicate with proxy',
+                'details': str(e)
+            }), 503
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': 'Internal server error',
+            'details': str(e)
+        }), 500
+
+@app.route('/batch', methods=['POST'])
+@admission_controlled
+def handle_batch():
+    try:
+        auth_start = time.perf_counter()
+        authenticated = is_authenticated(request)
+        g.server_timing['auth'] = time.perf_counter() - auth_start
+        if not authenticated:
+            return jsonify({
+                'success': False,
+                'error': 'Authentication failed - API key required'
+            }), 401
+        
+        data = request.get_json()
+        if not data:
+            return jsonify({
+                'success': False,
+                'error': 'Invalid request format'
+            }), 400
+        
+        statements = data.get('statements')
+        strategy = data.get('strategy', 'direct')
+        response_format = data.get('format', 'json')
+        
+        if not isinstance(statements, list) or not statements:
+            return jsonify({
+                'success': False,
+                'error': 'No statements provided'
+            }), 400
+        
+        if response_format not in RESPONSE_FORMATS:
+            return jsonify({
+                'success': False,
+                'error': f'Unsupported format - expected one of {list(RESPONSE_FORMATS)}'
+            }), 400
+        
+        try:
+            proxy_response = post_to_proxy(
+                PROXY_BATCH_URL,
+                json={'statements': statements, 'strategy': strategy, 'format': response_format},
+                timeout=remaining_budget()
+            )
+            
+            return Response(
+                proxy_response.content,
+                status=proxy_response.status_code,
+                content_type=proxy_response.headers.get('Content-Type', 'application/json')
+            )
         
         except requests.exceptions.RequestException as e:
             return jsonify({
@@ -95,8 +576,26 @@ if __name__ == '__main__':
     app.run(host='0.0.0.0', port=8080, debug=False)
 GATEKEEPER_APP
 
-echo "Creating systemd service for gatekeeper"
-cat > /etc/systemd/system/gatekeeper.service <<'SERVICE'
+echo "Creating gunicorn configuration for gatekeeper"
+cat > /opt/gatekeeper/gunicorn.conf.py <<'GUNICORN_CONFIG'
+import multiprocessing
+import os
+
+bind = '0.0.0.0:8080'
+workers = int(os.environ.get('GATEKEEPER_WORKERS', multiprocessing.cpu_count()))
+threads = int(os.environ.get('GATEKEEPER_THREADS', 16))
+worker_class = 'gthread'
+keepalive = 75
+GUNICORN_CONFIG
+
+GATEKEEPER_MODE="__GATEKEEPER_MODE__"
+case "${GATEKEEPER_MODE}" in
+    wsgi) GATEKEEPER_EXEC="/usr/bin/python3 -m gunicorn -c /opt/gatekeeper/gunicorn.conf.py gatekeeper_server:app" ;;
+    *) GATEKEEPER_EXEC="/usr/bin/python3 /opt/gatekeeper/gatekeeper_server.py" ;;
+esac
+
+echo "Creating systemd service for gatekeeper (${GATEKEEPER_MODE} mode)"
+cat > /etc/systemd/system/gatekeeper.service <<SERVICE
 [Unit]
 Description=MySQL Cluster Gatekeeper Service
 After=network.target
@@ -105,7 +604,20 @@ After=network.target
 Type=simple
 User=ubuntu
 WorkingDirectory=/opt/gatekeeper
-ExecStart=/usr/bin/python3 /opt/gatekeeper/gatekeeper_server.py
+Environment=GATEKEEPER_WORKERS=$(nproc)
+Environment=GATEKEEPER_THREADS=16
+Environment=PROXY_POOL_SIZE=16
+Environment=GATEKEEPER_MAX_CONCURRENCY=8
+Environment=GATEKEEPER_MAX_QUEUE=8
+Environment=GATEKEEPER_QUEUE_TIMEOUT=1
+Environment=RATE_LIMIT_RPS=0
+Environment=RATE_LIMIT_BURST=100
+Environment=RATE_LIMIT_GLOBAL_RPS=0
+Environment=RATE_LIMIT_GLOBAL_BURST=1000
+Environment=RATE_LIMIT_STATE=/dev/shm/gatekeeper-rate-limits
+Environment=METRICS_DIR=/dev/shm/gatekeeper-metrics
+ExecStartPre=/bin/rm -rf /dev/shm/gatekeeper-rate-limits /dev/shm/gatekeeper-metrics
+ExecStart=${GATEKEEPER_EXEC}
 Restart=always
 RestartSec=10
 
@@ -9,11 +9,11 @@ echo "Starting Proxy setup at $(date)"
 echo "Updating system packages"
 apt-get update -y
 
-echo "Installing Python3, MySQL client, and network tools"
-apt-get install -y python3 python3-pip mysql-client iputils-ping
+echo "Installing Python3 and MySQL client"
+apt-get install -y python3 python3-pip mysql-client
 
 echo "Installing Python packages"
-pip3 install flask pymysql requests
+pip3 install flask pymysql requests quart aiomysql uvicorn gunicorn msgpack
 
 echo "Creating proxy application directory"
 mkdir -p /opt/proxy
@@ -21,12 +21,24 @@ cd /opt/proxy
 
 echo "Creating proxy server application"
 cat > /opt/proxy/proxy_server.py <<'PROXY_APP'
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+import bisect
+import collections
+import fcntl
+import hmac
+import json
+import mmap
+import msgpack
 import pymysql
+import re
 import random
-import subprocess
+import struct
 import time
 import threading
+import os
+import zlib
 
 app = Flask(__name__)
 
@@ -38,83 +50,1540 @@ DB_CONFIG = {
     'database': 'sakila'
 }
 
+POOL_CONFIG = {
+    'min_size': int(os.environ.get('POOL_MIN_SIZE', 2)),
+    'max_size': int(os.environ.get('POOL_MAX_SIZE', 10)),
+    'borrow_timeout': float(os.environ.get('POOL_BORROW_TIMEOUT', 5)),
+    'max_lifetime': float(os.environ.get('POOL_MAX_LIFETIME', 1800)),
+    'max_idle': float(os.environ.get('POOL_MAX_IDLE', 300)),
+    'health_check_after': float(os.environ.get('POOL_HEALTH_CHECK_AFTER', 1)),
+    'reap_interval': float(os.environ.get('POOL_REAP_INTERVAL', 30))
+}
+
+CACHE_CONFIG = {
+    'enabled': os.environ.get('CACHE_ENABLED', '0') == '1',
+    'ttl': float(os.environ.get('CACHE_TTL', 5)),
+    'max_bytes': int(os.environ.get('CACHE_MAX_BYTES', 64 * 1024 * 1024)),
+    'max_entry_bytes': int(os.environ.get('CACHE_MAX_ENTRY_BYTES', 1024 * 1024)),
+    'generations_path': os.environ.get('CACHE_GENERATIONS', '/dev/shm/proxy-cache-generations'),
+    'generation_slots': 4096
+}
+
+HEALTH_CONFIG = {
+    'probe_interval': float(os.environ.get('PROBE_INTERVAL', 2)),
+    'ewma_alpha': float(os.environ.get('PROBE_EWMA_ALPHA', 0.3))
+}
+
+RESPONSE_FORMATS = ('json', 'columnar', 'msgpack')
+
+STRATEGIES = ('direct', 'random', 'customized', 'lag_aware', 'least_outstanding')
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+METRIC_TYPES = {
+    'proxy_requests_total': ('counter', 'Requests handled by endpoint, strategy, target host and read/write'),
+    'proxy_request_duration_seconds': ('histogram', 'Total time spent handling a request'),
+    'proxy_mysql_execution_seconds': ('histogram', 'Time spent executing statements and fetching rows on MySQL'),
+    'proxy_errors_total': ('counter', 'Responses with a 4xx or 5xx status'),
+    'proxy_requests_in_flight': ('gauge', 'Requests currently being handled'),
+    'proxy_worker_health_ms': ('gauge', 'EWMA of SELECT 1 latency per worker'),
+    'proxy_breaker_open': ('gauge', 'Whether the circuit breaker for a host is open'),
+    'proxy_hedged_reads_total': ('counter', 'Reads that sent a backup request, by which replica answered')
+}
+
+METRICS_CONFIG = {
+    'directory': os.environ.get('METRICS_DIR', '/dev/shm/proxy-metrics'),
+    'flush_interval': float(os.environ.get('METRICS_FLUSH_INTERVAL', 1))
+}
+
+STREAM_CONFIG = {
+    'chunk_rows': int(os.environ.get('STREAM_CHUNK_ROWS', 500))
+}
+
+BATCH_CONFIG = {
+    'max_statements': int(os.environ.get('BATCH_MAX_STATEMENTS', 1000)),
+    'max_parallel': int(os.environ.get('BATCH_MAX_PARALLEL', 32))
+}
+
+COALESCE_CONFIG = {
+    'enabled': os.environ.get('WRITE_COALESCE_ENABLED', '0') == '1',
+    'window': float(os.environ.get('WRITE_COALESCE_WINDOW', 0.002)),
+    'max_rows': int(os.environ.get('WRITE_COALESCE_MAX_ROWS', 100))
+}
+
+LAG_CONFIG = {
+    'max_lag': float(os.environ.get('REPLICA_MAX_LAG', 1)),
+    'sample_interval': float(os.environ.get('LAG_SAMPLE_INTERVAL', 2)),
+    'latency_alpha': float(os.environ.get('LATENCY_EWMA_ALPHA', 0.2)),
+    'default_latency': 0.01
+}
+
+BALANCER_CONFIG = {
+    'choices': int(os.environ.get('BALANCER_CHOICES', 2)),
+    'weights': dict(zip(DB_CONFIG['worker_hosts'], [float(w) for w in os.environ.get('WORKER_WEIGHTS', '').split(',') if w]))
+}
+
+BREAKER_CONFIG = {
+    'failure_threshold': int(os.environ.get('BREAKER_FAILURE_THRESHOLD', 5)),
+    'cooldown': float(os.environ.get('BREAKER_COOLDOWN', 10))
+}
+
+HEDGE_CONFIG = {
+    'enabled': os.environ.get('HEDGED_READS_ENABLED', '0') == '1',
+    'percentile': float(os.environ.get('HEDGE_PERCENTILE', 95)),
+    'min_delay': float(os.environ.get('HEDGE_MIN_DELAY', 0.002)),
+    'default_delay': 0.05,
+    'samples': 1000,
+    'refresh_every': 50
+}
+
+REGISTRY_CONFIG = {
+    'path': os.environ.get('WORKER_REGISTRY', '/opt/proxy/workers.json'),
+    'admin_token': os.environ.get('PROXY_ADMIN_TOKEN', '')
+}
+
+HOST_PATTERN = re.compile(r'^[A-Za-z0-9.-]+$')
+TABLE_PATTERN = re.compile(r'\b(?:FROM|JOIN|INTO|UPDATE|TABLE)\s+`?(?:\w+`?\.`?)?(\w+)`?', re.IGNORECASE)
+PLACEHOLDER_PATTERN = re.compile(r'%[s%]')
+QUOTED_OR_WHITESPACE_PATTERN = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"|`[^`]*`|\s+", re.DOTALL)
+SINGLE_ROW_INSERT_PATTERN = re.compile(r'\s*(INSERT\s+INTO\s+`?(?:\w+`?\.`?)?\w+`?\s*(?:\([^()]*\))?\s*VALUES)\s*(\(.*\))\s*;?\s*$', re.IGNORECASE | re.DOTALL)
+FROM_LIST_PATTERN = re.compile(r'\bFROM\s+([^()]+?)(?=\b(?:WHERE|GROUP|ORDER|LIMIT|HAVING|JOIN|UNION|FOR)\b|\)|;|$)', re.IGNORECASE)
+
 worker_health = {}
 health_lock = threading.Lock()
 
-def is_read_query(query):
-    query_upper = query.strip().upper()
-    read_keywords = ['SELECT', 'SHOW', 'DESCRIBE', 'EXPLAIN']
-    write_keywords = ['INSERT', 'UPDATE', 'DELETE', 'CREATE', 'DROP', 'ALTER', 'GRANT', 'REVOKE']
-    for keyword in write_keywords:
-        if query_upper.startswith(keyword): return False
-    for keyword in read_keywords:
-        if query_upper.startswith(keyword): return True
-    return False
+worker_lag = {}
+host_latency = {}
+host_outstanding = collections.Counter()
+routing_lock = threading.Lock()
 
-def execute_query(host, query):
-    try:
+pools = {}
+pools_lock = threading.Lock()
+
+registry_state = {'mtime': None}
+
+batch_executor = ThreadPoolExecutor(max_workers=BATCH_CONFIG['max_parallel'])
+hedge_executor = ThreadPoolExecutor(max_workers=BATCH_CONFIG['max_parallel'])
+
+class ConnectionPool:
+    def __init__(self, host):
+        self.host = host
+        self.idle = collections.deque()
+        self.size = 0
+        self.waiting = 0
+        self.cond = threading.Condition()
+        self.stats = {'borrows': 0, 'created': 0, 'closed': 0, 'waits': 0, 'timeouts': 0,
+                      'health_check_failures': 0, 'wait_time_total': 0.0, 'wait_time_max': 0.0}
+
+    def _connect(self):
         connection = pymysql.connect(
-            host=host, user=DB_CONFIG['user'], password=DB_CONFIG['password'],
-            database=DB_CONFIG['database'], cursorclass=pymysql.cursors.DictCursor
+            host=self.host, user=DB_CONFIG['user'], password=DB_CONFIG['password'],
+            database=DB_CONFIG['database'], cursorclass=pymysql.cursors.DictCursor, autocommit=True
         )
-        with connection.cursor() as cursor:
-            cursor.execute(query)
-            if is_read_query(query):
-                return {'success': True, 'data': cursor.fetchall(), 'host': host}
-            else:
-                connection.commit()
-                return {'success': True, 'affected_rows': cursor.rowcount, 'host': host}
+        with self.cond: self.stats['created'] += 1
+        now = time.time()
+        return [connection, now, now]
+
+    def _close(self, entry):
+        try: entry[0].close()
+        except Exception: pass
+        with self.cond:
+            self.size -= 1
+            self.stats['closed'] += 1
+            self.cond.notify()
+
+    def _is_usable(self, entry):
+        now = time.time()
+        if now - entry[1] > POOL_CONFIG['max_lifetime']: return False
+        if now - entry[2] < POOL_CONFIG['health_check_after']: return True
+        try:
+            entry[0].ping(reconnect=False)
+            return True
+        except Exception:
+            with self.cond: self.stats['health_check_failures'] += 1
+            return False
+
+    def fill(self):
+        while True:
+            with self.cond:
+                if self.size >= POOL_CONFIG['min_size']: return
+                self.size += 1
+            try: entry = self._connect()
+            except Exception:
+                with self.cond:
+                    self.size -= 1
+                    self.cond.notify()
+                return
+            self.release(entry)
+
+    def acquire(self):
+        start = time.time()
+        deadline = start + POOL_CONFIG['borrow_timeout']
+        while True:
+            entry = None
+            with self.cond:
+                while not self.idle and self.size >= POOL_CONFIG['max_size']:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        self.stats['timeouts'] += 1
+                        raise TimeoutError(f'Timed out waiting for a connection to {self.host}')
+                    self.waiting += 1
+                    self.cond.wait(remaining)
+                    self.waiting -= 1
+                if self.idle: entry = self.idle.pop()
+                else: self.size += 1
+                waited = time.time() - start
+                self.stats['borrows'] += 1
+                if waited > 0.001: self.stats['waits'] += 1
+                self.stats['wait_time_total'] += waited
+                self.stats['wait_time_max'] = max(self.stats['wait_time_max'], waited)
+            if entry is None:
+                try: return self._connect()
+                except Exception:
+                    with self.cond:
+                        self.size -= 1
+                        self.cond.notify()
+                    raise
+            if self._is_usable(entry): return entry
+            self._close(entry)
+
+    def release(self, entry, discard=False):
+        if discard or time.time() - entry[1] > POOL_CONFIG['max_lifetime']:
+            self._close(entry)
+            return
+        entry[2] = time.time()
+        with self.cond:
+            self.idle.append(entry)
+            self.cond.notify()
+
+    @contextmanager
+    def connection(self):
+        entry = self.acquire()
+        try:
+            yield entry[0]
+        except Exception:
+            self.release(entry, discard=True)
+            raise
+        self.release(entry)
+
+    def reap(self):
+        now = time.time()
+        expired = []
+        with self.cond:
+            for entry in list(self.idle):
+                if self.size - len(expired) <= POOL_CONFIG['min_size'] and now - entry[1] <= POOL_CONFIG['max_lifetime']: break
+                if now - entry[2] > POOL_CONFIG['max_idle'] or now - entry[1] > POOL_CONFIG['max_lifetime']:
+                    self.idle.remove(entry)
+                    expired.append(entry)
+        for entry in expired: self._close(entry)
+        self.fill()
+
+    def close(self):
+        with self.cond:
+            entries = list(self.idle)
+            self.idle.clear()
+        for entry in entries: self._close(entry)
+
+    def get_stats(self):
+        with self.cond:
+            stats = dict(self.stats)
+            stats.update({'size': self.size, 'idle': len(self.idle), 'in_use': self.size - len(self.idle),
+                          'waiting': self.waiting, 'min_size': POOL_CONFIG['min_size'], 'max_size': POOL_CONFIG['max_size']})
+        stats['wait_time_avg'] = stats['wait_time_total'] / stats['borrows'] if stats['borrows'] else 0.0
+        return stats
+
+def get_pool(host):
+    with pools_lock:
+        if host not in pools: pools[host] = ConnectionPool(host)
+        return pools[host]
+
+def apply_worker_registry(hosts, weights):
+    BALANCER_CONFIG['weights'] = dict(weights)
+    DB_CONFIG['worker_hosts'] = list(hosts)
+    with pools_lock:
+        removed = [pools.pop(host) for host in list(pools) if host != DB_CONFIG['manager_host'] and host not in hosts]
+    for pool in removed: pool.close()
+
+def load_worker_registry():
+    try: mtime = os.stat(REGISTRY_CONFIG['path']).st_mtime_ns
+    except OSError: return
+    if mtime == registry_state['mtime']: return
+    with open(REGISTRY_CONFIG['path']) as f: registry = json.load(f)
+    registry_state['mtime'] = mtime
+    apply_worker_registry(registry['hosts'], registry['weights'])
+
+def update_worker_registry(update):
+    with open(REGISTRY_CONFIG['path'] + '.lock', 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        load_worker_registry()
+        registry = {'hosts': [w for w in DB_CONFIG['worker_hosts'] if w], 'weights': dict(BALANCER_CONFIG['weights'])}
+        changed = update(registry)
+        if changed:
+            with open(REGISTRY_CONFIG['path'] + '.tmp', 'w') as f: json.dump(registry, f)
+            os.replace(REGISTRY_CONFIG['path'] + '.tmp', REGISTRY_CONFIG['path'])
+            load_worker_registry()
+        return changed
+
+def register_worker(host, weight=None):
+    def update(registry):
+        changed = host not in registry['hosts'] or (weight is not None and registry['weights'].get(host) != weight)
+        if host not in registry['hosts']: registry['hosts'].append(host)
+        if weight is not None: registry['weights'][host] = weight
+        return changed
+    return update_worker_registry(update)
+
+def deregister_worker(host):
+    def update(registry):
+        if host not in registry['hosts']: return False
+        registry['hosts'].remove(host)
+        registry['weights'].pop(host, None)
+        return True
+    return update_worker_registry(update)
+
+def list_workers():
+    workers = [w for w in DB_CONFIG['worker_hosts'] if w]
+    return {'workers': workers, 'weights': {w: BALANCER_CONFIG['weights'].get(w, 1.0) for w in workers}}
+
+def parse_worker_registration(data):
+    host = str(data.get('host', ''))
+    weight = data.get('weight')
+    if not HOST_PATTERN.match(host): return None, None, 'host must be an IP address or hostname'
+    if weight is not None and (isinstance(weight, bool) or not isinstance(weight, (int, float)) or weight <= 0):
+        return None, None, 'weight must be a positive number'
+    return host, None if weight is None else float(weight), None
+
+def is_admin(request):
+    return bool(REGISTRY_CONFIG['admin_token']) and hmac.compare_digest(request.headers.get('X-Admin-Token', '').encode(), REGISTRY_CONFIG['admin_token'].encode())
+
+def normalize_query(query, params=None):
+    if "'" in query or '"' in query or '`' in query:
+        key = QUOTED_OR_WHITESPACE_PATTERN.sub(lambda token: token.group() if token.group()[0] in '\'"`' else ' ', query).strip()
+    else:
+        key = ' '.join(query.split())
+    key = key.rstrip(';').rstrip()
+    return key if params is None else f'{key}\0{json.dumps(params, default=str)}'
+
+def get_query_tables(query):
+    tables = {table.lower() for table in TABLE_PATTERN.findall(query)}
+    for from_list in FROM_LIST_PATTERN.findall(query):
+        for item in from_list.split(',')[1:]:
+            if item.split(): tables.add(item.split()[0].strip('`').split('.')[-1].strip('`').lower())
+    return tables
+
+class TableGenerations:
+    def __init__(self, path, slots):
+        self.path = path
+        self.slots = slots
+        self.map = None
+        self.lock = threading.Lock()
+
+    def _open(self):
+        with self.lock:
+            if self.map is None:
+                self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+                if os.fstat(self.fd).st_size < self.slots * 8: os.ftruncate(self.fd, self.slots * 8)
+                self.map = mmap.mmap(self.fd, self.slots * 8)
+        return self.map
+
+    def _slots(self, tables):
+        return [0] + [1 + zlib.crc32(table.encode()) % (self.slots - 1) for table in sorted(tables)]
+
+    def read(self, tables):
+        generations = self._open()
+        return tuple(struct.unpack_from('Q', generations, slot * 8)[0] for slot in self._slots(tables))
+
+    def bump(self, tables):
+        generations = self._open()
+        slots = set(self._slots(tables)[1:]) if tables else {0}
+        with self.lock:
+            fcntl.flock(self.fd, fcntl.LOCK_EX)
+            try:
+                for slot in slots: struct.pack_into('Q', generations, slot * 8, struct.unpack_from('Q', generations, slot * 8)[0] + 1)
+            finally:
+                fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+class ResultCache:
+    def __init__(self):
+        self.generations = TableGenerations(CACHE_CONFIG['generations_path'], CACHE_CONFIG['generation_slots'])
+        self.entries = collections.OrderedDict()
+        self.tables = collections.defaultdict(set)
+        self.bytes = 0
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'expired': 0, 'evictions': 0, 'invalidations': 0, 'rejected': 0}
+
+    def _remove(self, key):
+        result, tables, size, _, _ = self.entries.pop(key)
+        self.bytes -= size
+        for table in tables:
+            self.tables[table].discard(key)
+            if not self.tables[table]: del self.tables[table]
+
+    def get(self, query, params=None):
+        key = normalize_query(query, params)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+            if time.time() > entry[3]:
+                self._remove(key)
+                self.stats['expired'] += 1
+                self.stats['misses'] += 1
+                return None
+            if self.generations.read(entry[1]) != entry[4]:
+                self._remove(key)
+                self.stats['invalidations'] += 1
+                self.stats['misses'] += 1
+                return None
+            self.entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return entry[0]
+
+    def snapshot(self, query):
+        tables = get_query_tables(query)
+        return tables, self.generations.read(tables) if tables else None
+
+    def put(self, query, result, snapshot, params=None):
+        tables, generations = snapshot
+        if not tables: return
+        size = len(json.dumps(result, default=str))
+        key = normalize_query(query, params)
+        with self.lock:
+            if size > CACHE_CONFIG['max_entry_bytes'] or size > CACHE_CONFIG['max_bytes']:
+                self.stats['rejected'] += 1
+                return
+            if key in self.entries: self._remove(key)
+            while self.bytes + size > CACHE_CONFIG['max_bytes']:
+                self._remove(next(iter(self.entries)))
+                self.stats['evictions'] += 1
+            self.entries[key] = (result, tables, size, time.time() + CACHE_CONFIG['ttl'], generations)
+            self.bytes += size
+            for table in tables: self.tables[table].add(key)
+
+    def invalidate(self, query):
+        tables = get_query_tables(query)
+        self.generations.bump(tables)
+        with self.lock:
+            if not tables:
+                self.stats['invalidations'] += len(self.entries)
+                self.entries.clear()
+                self.tables.clear()
+                self.bytes = 0
+                return
+            for table in tables:
+                for key in list(self.tables.get(table, ())):
+                    self._remove(key)
+                    self.stats['invalidations'] += 1
+
+    def get_stats(self):
+        with self.lock:
+            stats = dict(self.stats)
+            stats.update({'enabled': CACHE_CONFIG['enabled'], 'entries': len(self.entries), 'bytes': self.bytes,
+                          'max_bytes': CACHE_CONFIG['max_bytes'], 'ttl': CACHE_CONFIG['ttl']})
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_ratio'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
+
+result_cache = ResultCache()
+
+def format_metric_value(value):
+    if value != value: return 'NaN'
+    if value in (float('inf'), float('-inf')): return '+Inf' if value > 0 else '-Inf'
+    return repr(value)
+
+def format_labels(labels):
+    if not labels: return ''
+    return '{' + ','.join(f'{key}={json.dumps(str(value), ensure_ascii=False)}' for key, value in labels) + '}'
+
+def process_alive(pid):
+    try: os.kill(pid, 0)
+    except ProcessLookupError: return False
+    except PermissionError: return True
+    return True
+
+def metric_key(key):
+    return key[0], tuple(tuple(label) for label in key[1])
+
+class Metrics:
+    def __init__(self, types, directory, flush_interval):
+        self.types = types
+        self.values = {}
+        self.histograms = {}
+        self.lock = threading.Lock()
+        self.directory = directory
+        self.path = os.path.join(directory, f'{os.getpid()}-{time.time_ns()}.json')
+        threading.Thread(target=self._flush_loop, args=(flush_interval,), daemon=True).start()
+
+    def inc(self, name, labels=(), value=1):
+        with self.lock: self.values[(name, labels)] = self.values.get((name, labels), 0) + value
+
+    def observe(self, name, labels, value):
+        index = bisect.bisect_left(LATENCY_BUCKETS, value)
+        with self.lock:
+            histogram = self.histograms.get((name, labels))
+            if histogram is None: histogram = self.histograms[(name, labels)] = [[0] * (len(LATENCY_BUCKETS) + 1), 0.0]
+            histogram[0][index] += 1
+            histogram[1] += value
+
+    def _snapshot(self):
+        with self.lock:
+            return list(self.values.items()), [(key, list(histogram[0]), histogram[1]) for key, histogram in self.histograms.items()]
+
+    def flush(self):
+        values, histograms = self._snapshot()
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.path + '.tmp', 'w') as f: json.dump({'values': values, 'histograms': histograms}, f)
+        os.replace(self.path + '.tmp', self.path)
+
+    def _flush_loop(self, interval):
+        while True:
+            time.sleep(interval)
+            try: self.flush()
+            except OSError: pass
+
+    def _collect(self):
+        sources = [(*self._snapshot(), True)]
+        try: files = [name for name in os.listdir(self.directory) if name.endswith('.json')]
+        except OSError: files = []
+        for name in files:
+            path = os.path.join(self.directory, name)
+            if path == self.path: continue
+            try:
+                with open(path) as f: data = json.load(f)
+            except (OSError, ValueError): continue
+            sources.append(([(metric_key(key), value) for key, value in data['values']],
+                            [(metric_key(key), buckets, total) for key, buckets, total in data['histograms']],
+                            process_alive(int(name.split('-')[0]))))
+        values, histograms = {}, {}
+        for process_values, process_histograms, alive in sources:
+            for key, value in process_values:
+                if alive or self.types.get(key[0], ('counter',))[0] != 'gauge': values[key] = values.get(key, 0) + value
+            for key, buckets, total in process_histograms:
+                merged = histograms.setdefault(key, [[0] * len(buckets), 0.0])
+                merged[0] = [count + other for count, other in zip(merged[0], buckets)]
+                merged[1] += total
+        return list(values.items()), [(key, buckets, total) for key, (buckets, total) in histograms.items()]
+
+    def render(self, gauges=()):
+        values, histograms = self._collect()
+        pid = (('pid', str(os.getpid())),)
+        series = collections.defaultdict(list)
+        for (name, labels), value in values + [((name, labels + pid), value) for (name, labels), value in gauges]:
+            series[name].append(f'{name}{format_labels(labels)} {format_metric_value(value)}')
+        for (name, labels), buckets, total in histograms:
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS + (float('inf'),), buckets):
+                cumulative += count
+                series[name].append(f"{name}_bucket{format_labels(labels + (('le', format_metric_value(bound)),))} {cumulative}")
+            series[name].append(f'{name}_sum{format_labels(labels)} {format_metric_value(total)}')
+            series[name].append(f'{name}_count{format_labels(labels)} {cumulative}')
+        lines = []
+        for name, (kind, description) in self.types.items():
+            lines += [f'# HELP {name} {description}', f'# TYPE {name} {kind}'] + series.get(name, [])
+        return '\n'.join(lines) + '\n'
+
+metrics = Metrics(METRIC_TYPES, METRICS_CONFIG['directory'], METRICS_CONFIG['flush_interval'])
+
+def request_labels(endpoint, strategy, host, kind):
+    return (('endpoint', endpoint), ('strategy', strategy if strategy in STRATEGIES else 'other'), ('host', host), ('kind', kind))
+
+def format_server_timing(timings, prefix=''):
+    return ', '.join(f'{prefix}{name};dur={duration * 1000:.3f}' for name, duration in timings.items())
+
+def request_endpoint(request):
+    return request.url_rule.rule if request.url_rule else 'unknown'
+
+def render_metrics():
+    with health_lock:
+        health = [(('proxy_worker_health_ms', (('host', w),)), latency) for w, latency in worker_health.items()]
+    breakers = [(('proxy_breaker_open', (('host', host),)), int(state['open'])) for host, state in breaker.get_stats().items()]
+    return metrics.render(health + breakers)
+
+READ_KEYWORDS = {'SELECT', 'SHOW', 'DESCRIBE', 'DESC', 'EXPLAIN', 'TABLE'}
+LEADING_TOKEN_PATTERN = re.compile(r'(?:\s+|--[^\n]*(?:\n|$)|#[^\n]*(?:\n|$)|/\*.*?\*/|\()*(\w+)', re.DOTALL)
+SQL_TOKEN_PATTERN = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"|`[^`]*`|--[^\n]*|#[^\n]*|/\*.*?\*/|[();]", re.DOTALL)
+CTE_NAME_PATTERN = re.compile(r'(?:\s+|--[^\n]*(?:\n|$)|#[^\n]*(?:\n|$)|/\*.*?\*/)*(?:RECURSIVE\b)?(?:\s+|--[^\n]*(?:\n|$)|#[^\n]*(?:\n|$)|/\*.*?\*/)*(?:\w+|`[^`]*`)\s*', re.IGNORECASE | re.DOTALL)
+CTE_AS_PATTERN = re.compile(r'\s*AS\s*\(', re.IGNORECASE)
+CTE_SEPARATOR_PATTERN = re.compile(r'\s*,', re.DOTALL)
+LOCKING_READ_PATTERN = re.compile(r'\bFOR\s+(?:UPDATE|SHARE)\b|\bLOCK\s+IN\s+SHARE\s+MODE\b', re.IGNORECASE)
+LOCKING_READ_WINDOW = 256
+
+def strip_comments(query):
+    if '-' not in query and '#' not in query and '/' not in query: return query
+    return SQL_TOKEN_PATTERN.sub(lambda token: token.group()[3:-2] if token.group().startswith('/*!') else ' ' if token.group()[0] in '-#/' else token.group(), query)
+
+def comment_free_tail(body):
+    start = max(len(body) - LOCKING_READ_WINDOW, 0)
+    while start:
+        line_start = body.rfind('\n', 0, start) + 1
+        openers = [body.rfind('#', line_start, start)]
+        if body.find('-', line_start, start) >= 0: openers.append(body.rfind('--', line_start, start))
+        tail = body[start:]
+        close = tail.find('*/')
+        if close >= 0 and not 0 <= tail.find('/*') < close: openers.append(body.rfind('/*', 0, start))
+        openers = [opener for opener in openers if opener >= 0]
+        if not openers: break
+        start = max(min(openers) - LOCKING_READ_WINDOW, 0)
+    tail = strip_comments(body[start:]).rstrip()
+    return tail[-LOCKING_READ_WINDOW:]
+
+def is_locking_read(query):
+    return LOCKING_READ_PATTERN.search(comment_free_tail(query.rstrip())) is not None
+
+def skip_parenthesized(query, pos):
+    depth = 1
+    for token in SQL_TOKEN_PATTERN.finditer(query, pos):
+        if token.group() == '(': depth += 1
+        elif token.group() == ')':
+            depth -= 1
+            if depth == 0: return token.end()
+    return len(query)
+
+def skip_ctes(query, pos):
+    while True:
+        name = CTE_NAME_PATTERN.match(query, pos)
+        if not name: return pos
+        pos = name.end()
+        if query.startswith('(', pos): pos = skip_parenthesized(query, pos + 1)
+        as_match = CTE_AS_PATTERN.match(query, pos)
+        if not as_match: return pos
+        pos = skip_parenthesized(query, as_match.end())
+        separator = CTE_SEPARATOR_PATTERN.match(query, pos)
+        if not separator: return pos
+        pos = separator.end()
+
+def has_multiple_statements(query):
+    if ';' not in query: return False
+    body = query.rstrip()
+    if body.endswith(';') and body.count(';') == 1: return False
+    for token in SQL_TOKEN_PATTERN.finditer(query):
+        if token.group() == ';' and LEADING_TOKEN_PATTERN.match(query, token.end()): return True
+    return False
+
+def is_read_query(query):
+    leading = LEADING_TOKEN_PATTERN.match(query)
+    if not leading: return False
+    keyword = leading.group(1).upper()
+    if keyword == 'WITH':
+        leading = LEADING_TOKEN_PATTERN.match(query, skip_ctes(query, leading.end()))
+        if not leading: return False
+        keyword = leading.group(1).upper()
+    if keyword not in READ_KEYWORDS: return False
+    if keyword == 'SELECT' and is_locking_read(query): return False
+    return not has_multiple_statements(query)
+
+def is_host_failure(error):
+    if isinstance(error, pymysql.err.OperationalError): return bool(error.args) and isinstance(error.args[0], int) and error.args[0] >= 2000
+    return isinstance(error, (pymysql.err.InterfaceError, OSError, TimeoutError))
+
+class CircuitBreaker:
+    def __init__(self):
+        self.hosts = {}
+        self.lock = threading.Lock()
+
+    def _state(self, host):
+        if host not in self.hosts: self.hosts[host] = {'failures': 0, 'open_until': 0.0, 'opened': 0}
+        return self.hosts[host]
+
+    def is_available(self, host):
+        with self.lock:
+            state = self.hosts.get(host)
+            return state is None or state['failures'] < BREAKER_CONFIG['failure_threshold'] or time.time() >= state['open_until']
+
+    def record_success(self, host):
+        with self.lock:
+            state = self._state(host)
+            if state['failures'] >= BREAKER_CONFIG['failure_threshold'] and time.time() < state['open_until']: return
+            state['failures'] = 0
+
+    def record_failure(self, host):
+        with self.lock:
+            state = self._state(host)
+            state['failures'] += 1
+            if state['failures'] >= BREAKER_CONFIG['failure_threshold']:
+                if time.time() >= state['open_until']: state['opened'] += 1
+                state['open_until'] = time.time() + BREAKER_CONFIG['cooldown']
+
+    def get_stats(self):
+        with self.lock:
+            now = time.time()
+            return {host: {'open': state['failures'] >= BREAKER_CONFIG['failure_threshold'] and now < state['open_until'],
+                           'failures': state['failures'], 'times_opened': state['opened'],
+                           'retry_in': max(state['open_until'] - now, 0.0)} for host, state in self.hosts.items()}
+
+breaker = CircuitBreaker()
+
+class LatencyTracker:
+    def __init__(self):
+        self.samples = collections.deque(maxlen=HEDGE_CONFIG['samples'])
+        self.recorded = 0
+        self.delay = HEDGE_CONFIG['default_delay']
+        self.lock = threading.Lock()
+
+    def record(self, elapsed):
+        with self.lock:
+            self.samples.append(elapsed)
+            self.recorded += 1
+            if self.recorded % HEDGE_CONFIG['refresh_every']: return
+            ordered = sorted(self.samples)
+            index = min(int(len(ordered) * HEDGE_CONFIG['percentile'] / 100), len(ordered) - 1)
+            self.delay = max(ordered[index], HEDGE_CONFIG['min_delay'])
+
+    def get_delay(self):
+        return self.delay
+
+read_latency = LatencyTracker()
+
+def available_workers():
+    return [w for w in DB_CONFIG['worker_hosts'] if w and breaker.is_available(w)]
+
+def record_latency(host, elapsed):
+    with routing_lock:
+        previous = host_latency.get(host)
+        alpha = LAG_CONFIG['latency_alpha']
+        host_latency[host] = elapsed if previous is None else alpha * elapsed + (1 - alpha) * previous
+
+@contextmanager
+def track_outstanding(host):
+    with routing_lock: host_outstanding[host] += 1
+    try:
+        yield
+    finally:
+        with routing_lock: host_outstanding[host] -= 1
+
+def column_names(cursor):
+    names = []
+    for field in cursor._result.fields:
+        names.append(f'{field.table_name}.{field.name}' if field.name in names else field.name)
+    return names
+
+def validate_params(query, params):
+    if params is None: return None
+    if not isinstance(params, list): return 'params must be a list'
+    expected = sum(token == '%s' for token in PLACEHOLDER_PATTERN.findall(query))
+    if len(params) != expected: return f'Query has {expected} placeholders but {len(params)} params were given'
+    return None
+
+def execute_query(host, query, params=None, timings=None):
+    start = time.time()
+    try:
+        connect_start = time.perf_counter()
+        with track_outstanding(host), get_pool(host).connection() as connection:
+            with connection.cursor(pymysql.cursors.Cursor) as cursor:
+                execute_start = time.perf_counter()
+                cursor.execute(query, params)
+                if cursor.description is not None:
+                    fetch_start = time.perf_counter()
+                    columns = column_names(cursor)
+                    result = {'success': True, 'columns': columns, 'rows': cursor.fetchall(), 'host': host}
+                else:
+                    connection.commit()
+                    fetch_start = time.perf_counter()
+                    result = {'success': True, 'affected_rows': cursor.rowcount, 'host': host}
+                fetch_end = time.perf_counter()
+                metrics.observe('proxy_mysql_execution_seconds', (('host', host), ('kind', 'read' if 'rows' in result else 'write')),
+                                fetch_end - execute_start)
+        if timings is not None:
+            timings.update(connect=execute_start - connect_start, execute=fetch_start - execute_start, fetch=fetch_end - fetch_start)
+        record_latency(host, time.time() - start)
+        breaker.record_success(host)
+        if 'rows' in result: read_latency.record(time.time() - start)
+        return result
     except Exception as e:
+        if is_host_failure(e): breaker.record_failure(host)
         return {'success': False, 'error': str(e), 'host': host}
-    finally:
-        if 'connection' in locals(): connection.close()
 
-def get_ping_time(host):
+def execute_hedged(host, query, params=None, timings=None):
+    primary_timings = {}
+    pending = {hedge_executor.submit(execute_query, host, query, params, primary_timings): primary_timings}
+    done, _ = wait(pending, timeout=read_latency.get_delay())
+    if done:
+        result = next(iter(done)).result()
+        if result['success']:
+            if timings is not None: timings.update(primary_timings)
+            return result
+        del pending[next(iter(done))]
+    backups = [w for w in available_workers() if w != host]
+    if not backups: return next(iter(done)).result() if done else next(iter(pending)).result()
+    backup_timings = {}
+    pending[hedge_executor.submit(execute_query, random.choice(backups), query, params, backup_timings)] = backup_timings
+    result = None
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            future_timings = pending.pop(future)
+            result = future.result()
+            if result['success']:
+                metrics.inc('proxy_hedged_reads_total', (('winner', 'primary' if future_timings is primary_timings else 'backup'),))
+                if timings is not None: timings.update(future_timings)
+                return result
+    metrics.inc('proxy_hedged_reads_total', (('winner', 'none'),))
+    return result
+
+def execute_read(host, query, params=None, timings=None):
+    if HEDGE_CONFIG['enabled'] and host != DB_CONFIG['manager_host']: return execute_hedged(host, query, params, timings)
+    return execute_query(host, query, params, timings)
+
+def execute_transaction(host, queries):
+    start = time.time()
+    try:
+        with get_pool(host).connection() as connection:
+            results = []
+            execute_start = time.perf_counter()
+            connection.begin()
+            try:
+                with connection.cursor(pymysql.cursors.Cursor) as cursor:
+                    for query in queries:
+                        cursor.execute(query)
+                        if cursor.description is not None:
+                            columns = column_names(cursor)
+                            results.append({'success': True, 'columns': columns, 'rows': cursor.fetchall(), 'host': host})
+                        else:
+                            results.append({'success': True, 'affected_rows': cursor.rowcount, 'host': host})
+                connection.commit()
+                metrics.observe('proxy_mysql_execution_seconds', (('host', host), ('kind', 'transaction')), time.perf_counter() - execute_start)
+            except pymysql.err.MySQLError as e:
+                connection.rollback()
+                failed = len(results)
+                return [{'success': False, 'error': str(e) if index == failed else 'Transaction rolled back', 'host': host}
+                        for index in range(len(queries))]
+        record_latency(host, time.time() - start)
+        return results
+    except Exception as e:
+        return [{'success': False, 'error': str(e), 'host': host} for _ in queries]
+
+def execute_read_group(host, queries):
+    return [execute_query(host, query) for query in queries]
+
+def validate_batch(statements):
+    if not isinstance(statements, list) or not statements: return 'statements must be a non-empty list'
+    if len(statements) > BATCH_CONFIG['max_statements']: return f"Batch exceeds {BATCH_CONFIG['max_statements']} statements"
+    if not all(isinstance(statement, str) for statement in statements): return 'statements must be strings'
+    return None
+
+def plan_batch(statements, strategy):
+    results = [None] * len(statements)
+    read_groups = collections.defaultdict(list)
+    writes = []
+    snapshots = {}
+    for index, query in enumerate(statements):
+        if not is_read_query(query):
+            writes.append(index)
+            continue
+        if CACHE_CONFIG['enabled']:
+            cached = result_cache.get(query)
+            if cached is not None:
+                results[index] = {**cached, 'cached': True}
+                continue
+            snapshots[index] = result_cache.snapshot(query)
+        read_groups[select_host(strategy, True)].append(index)
+    return results, read_groups, writes, snapshots
+
+def finish_batch(statements, results, read_groups, writes, snapshots):
+    if CACHE_CONFIG['enabled']:
+        for indexes in read_groups.values():
+            for index in indexes:
+                if results[index]['success']: result_cache.put(statements[index], results[index], snapshots[index])
+        for index in writes:
+            if results[index]['success']: result_cache.invalidate(statements[index])
+    return {'success': all(result['success'] for result in results), 'results': results}
+
+def execute_batch(statements, strategy):
+    results, read_groups, writes, snapshots = plan_batch(statements, strategy)
+    futures = {host: batch_executor.submit(execute_read_group, host, [statements[i] for i in indexes])
+               for host, indexes in read_groups.items()}
+    if writes:
+        for index, result in zip(writes, execute_transaction(DB_CONFIG['manager_host'], [statements[i] for i in writes])):
+            results[index] = result
+    for host, future in futures.items():
+        for index, result in zip(read_groups[host], future.result()): results[index] = result
+    return finish_batch(statements, results, read_groups, writes, snapshots)
+
+def match_single_row_insert(query):
+    match = SINGLE_ROW_INSERT_PATTERN.match(query)
+    if not match or skip_parenthesized(match.group(2), 1) != len(match.group(2)): return None
+    return ' '.join(match.group(1).split()), match.group(2)
+
+class WriteCoalescer:
+    def __init__(self):
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.stats = {'statements': 0, 'flushes': 0, 'merged_rows': 0, 'fallbacks': 0}
+
+    def submit(self, host, prefix, values, query):
+        entry = {'query': query, 'values': values, 'done': threading.Event(), 'result': None}
+        with self.lock:
+            self.stats['statements'] += 1
+            batch = self.pending.get((host, prefix))
+            leader = batch is None
+            if leader: batch = self.pending[(host, prefix)] = {'entries': [], 'full': threading.Event()}
+            batch['entries'].append(entry)
+            if len(batch['entries']) >= COALESCE_CONFIG['max_rows']:
+                del self.pending[(host, prefix)]
+                batch['full'].set()
+        if not leader:
+            entry['done'].wait()
+            return entry['result']
+        batch['full'].wait(COALESCE_CONFIG['window'])
+        with self.lock:
+            if self.pending.get((host, prefix)) is batch: del self.pending[(host, prefix)]
+        self.flush(host, prefix, batch['entries'])
+        return entry['result']
+
+    def flush(self, host, prefix, entries):
+        try:
+            if len(entries) > 1:
+                result = execute_query(host, f"{prefix} {', '.join(entry['values'] for entry in entries)}")
+                with self.lock:
+                    self.stats['flushes'] += 1
+                    if result['success']: self.stats['merged_rows'] += len(entries)
+                    else: self.stats['fallbacks'] += 1
+                if result['success']:
+                    for entry in entries:
+                        entry['result'] = {'success': True, 'affected_rows': 1, 'host': host, 'coalesced': len(entries)}
+                    return
+            for entry in entries: entry['result'] = execute_query(host, entry['query'])
+        finally:
+            for entry in entries:
+                if entry['result'] is None: entry['result'] = {'success': False, 'error': 'Coalesced write was not executed', 'host': host}
+                entry['done'].set()
+
+    def get_stats(self):
+        with self.lock:
+            return {**self.stats, 'enabled': COALESCE_CONFIG['enabled'], 'window': COALESCE_CONFIG['window'],
+                    'max_rows': COALESCE_CONFIG['max_rows']}
+
+write_coalescer = WriteCoalescer()
+
+def execute_write(host, query, params=None, timings=None):
+    if COALESCE_CONFIG['enabled'] and params is None:
+        insert = match_single_row_insert(query)
+        if insert: return write_coalescer.submit(host, *insert, query)
+    return execute_query(host, query, params, timings)
+
+def to_row_result(result):
+    if 'rows' not in result: return result
+    columns = result['columns']
+    row_result = {key: value for key, value in result.items() if key not in ('columns', 'rows')}
+    row_result['data'] = [dict(zip(columns, row)) for row in result['rows']]
+    return row_result
+
+def encode_result(result, response_format):
+    if response_format == 'msgpack':
+        return msgpack.packb(result, default=str, use_bin_type=True), 'application/msgpack'
+    return json.dumps(result, default=str, separators=(',', ':')), 'application/json'
+
+def build_response(result, response_format):
+    status = 200 if result['success'] else 500
+    if response_format == 'json': return jsonify(to_row_result(result)), status
+    body, mimetype = encode_result(result, response_format)
+    return Response(body, status=status, mimetype=mimetype)
+
+def build_batch_response(batch, response_format):
+    status = 200 if batch['success'] else 500
+    if response_format == 'json':
+        return jsonify({'success': batch['success'], 'results': [to_row_result(result) for result in batch['results']]}), status
+    body, mimetype = encode_result(batch, response_format)
+    return Response(body, status=status, mimetype=mimetype)
+
+def stream_query(host, query, params=None):
+    pool = get_pool(host)
+    try:
+        entry = pool.acquire()
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e), 'host': host}), 500
+    try:
+        cursor = entry[0].cursor(pymysql.cursors.SSDictCursor)
+        cursor.execute(query, params)
+    except Exception as e:
+        pool.release(entry, discard=True)
+        return jsonify({'success': False, 'error': str(e), 'host': host}), 500
+
+    def generate():
+        completed = False
+        row_count = 0
+        try:
+            yield json.dumps({'success': True, 'host': host, 'stream': True}) + '\n'
+            while True:
+                rows = cursor.fetchmany(STREAM_CONFIG['chunk_rows'])
+                if not rows: break
+                row_count += len(rows)
+                yield ''.join(json.dumps(row, default=str) + '\n' for row in rows)
+            cursor.close()
+            completed = True
+            yield json.dumps({'done': True, 'row_count': row_count}) + '\n'
+        except Exception as e:
+            yield json.dumps({'success': False, 'error': str(e), 'row_count': row_count}) + '\n'
+        finally:
+            pool.release(entry, discard=not completed)
+
+    return Response(generate(), mimetype='application/x-ndjson')
+
+def get_replica_lag(host):
+    try:
+        with get_pool(host).connection() as connection:
+            with connection.cursor() as cursor:
+                try: cursor.execute('SHOW REPLICA STATUS')
+                except pymysql.err.ProgrammingError: cursor.execute('SHOW SLAVE STATUS')
+                status = cursor.fetchone()
+        if not status: return None
+        lag = status.get('Seconds_Behind_Source', status.get('Seconds_Behind_Master'))
+        return float(lag) if lag is not None else None
+    except Exception: return None
+
+def probe_latency(host):
     try:
-        result = subprocess.run(['ping', '-c', '3', host], capture_output=True, text=True, timeout=5)
-        if result.returncode == 0:
-            for line in result.stdout.split('\n'):
-                if 'avg' in line: return float(line.split('/')[-3])
+        with get_pool(host).connection() as connection:
+            with connection.cursor() as cursor:
+                start = time.perf_counter()
+                cursor.execute('SELECT 1')
+                cursor.fetchone()
+                elapsed = (time.perf_counter() - start) * 1000
+        breaker.record_success(host)
+        return elapsed
+    except Exception:
+        breaker.record_failure(host)
         return float('inf')
-    except: return float('inf')
 
 def background_health_monitor():
+    executor, size = None, 0
     while True:
-        new_health = {w: get_ping_time(w) for w in DB_CONFIG['worker_hosts'] if w}
+        try: load_worker_registry()
+        except Exception: pass
+        workers = [w for w in DB_CONFIG['worker_hosts'] if w]
+        if len(workers) > size:
+            if executor: executor.shutdown(wait=False)
+            size = len(workers)
+            executor = ThreadPoolExecutor(max_workers=size)
+        samples = dict(zip(workers, executor.map(probe_latency, workers))) if workers else {}
+        alpha = HEALTH_CONFIG['ewma_alpha']
         with health_lock:
-            worker_health.clear()
-            worker_health.update(new_health)
-        time.sleep(10)
+            for w in list(worker_health):
+                if w not in samples: del worker_health[w]
+            for w, sample in samples.items():
+                previous = worker_health.get(w, float('inf'))
+                if sample == float('inf') or previous == float('inf'): worker_health[w] = sample
+                else: worker_health[w] = alpha * sample + (1 - alpha) * previous
+        time.sleep(HEALTH_CONFIG['probe_interval'])
+
+def background_lag_monitor():
+    while True:
+        new_lag = {w: get_replica_lag(w) for w in DB_CONFIG['worker_hosts'] if w}
+        with routing_lock:
+            worker_lag.clear()
+            worker_lag.update(new_lag)
+        time.sleep(LAG_CONFIG['sample_interval'])
+
+def background_pool_reaper():
+    while True:
+        for host in [DB_CONFIG['manager_host']] + DB_CONFIG['worker_hosts']:
+            if host: get_pool(host).reap()
+        time.sleep(POOL_CONFIG['reap_interval'])
+
+def select_host(strategy, is_read):
+    if not is_read: return DB_CONFIG['manager_host']
+    if strategy == 'direct': return DB_CONFIG['manager_host']
+    workers = available_workers()
+    if not workers: return DB_CONFIG['manager_host']
+    if strategy == 'customized':
+        with health_lock:
+            healthy = [w for w in workers if w in worker_health]
+            return min(healthy, key=worker_health.get) if healthy else DB_CONFIG['manager_host']
+    if strategy == 'lag_aware':
+        with routing_lock:
+            candidates = [w for w in workers if worker_lag.get(w) is not None and worker_lag[w] <= LAG_CONFIG['max_lag']]
+            weights = [1 / max(host_latency.get(w, LAG_CONFIG['default_latency']), 0.0001) for w in candidates]
+        return random.choices(candidates, weights)[0] if candidates else DB_CONFIG['manager_host']
+    if strategy == 'least_outstanding':
+        candidates = random.sample(workers, min(BALANCER_CONFIG['choices'], len(workers)))
+        with routing_lock:
+            return min(candidates, key=lambda w: (host_outstanding[w] + 1) * host_latency.get(w, LAG_CONFIG['default_latency'])
+                       / BALANCER_CONFIG['weights'].get(w, 1.0))
+    return random.choice(workers)
+
+@app.before_request
+def start_request_metrics():
+    g.request_start = time.perf_counter()
+    g.server_timing = {}
+    metrics.inc('proxy_requests_in_flight')
+
+@app.after_request
+def record_request_metrics(response):
+    elapsed = time.perf_counter() - g.request_start
+    response.headers['Server-Timing'] = format_server_timing({**g.server_timing, 'total': elapsed})
+    labels = g.get('metric_labels')
+    if labels is not None:
+        metrics.inc('proxy_requests_total', labels)
+        metrics.observe('proxy_request_duration_seconds', labels, elapsed)
+    if response.status_code >= 400:
+        metrics.inc('proxy_errors_total', (('endpoint', request_endpoint(request)), ('status', str(response.status_code))))
+    return response
+
+@app.teardown_request
+def finish_request_metrics(error=None):
+    metrics.inc('proxy_requests_in_flight', value=-1)
+    if error is not None: metrics.inc('proxy_errors_total', (('endpoint', request_endpoint(request)), ('status', '500')))
 
 @app.route('/health', methods=['GET'])
 def health():
     return jsonify({'status': 'healthy', 'service': 'proxy'}), 200
 
+@app.route('/pool/stats', methods=['GET'])
+def pool_stats():
+    with pools_lock:
+        current = dict(pools)
+    return jsonify({host: pool.get_stats() for host, pool in current.items()}), 200
+
+@app.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    return jsonify(result_cache.get_stats()), 200
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/coalesce/stats', methods=['GET'])
+def coalesce_stats():
+    return jsonify(write_coalescer.get_stats()), 200
+
+@app.route('/breakers', methods=['GET'])
+def breakers():
+    return jsonify({'hosts': breaker.get_stats(), 'hedge_delay': read_latency.get_delay() if HEDGE_CONFIG['enabled'] else None}), 200
+
+@app.route('/admin/workers', methods=['GET'])
+def admin_list_workers():
+    if not is_admin(request): return jsonify({'success': False, 'error': 'Invalid admin token'}), 401
+    load_worker_registry()
+    return jsonify(list_workers()), 200
+
+@app.route('/admin/workers', methods=['POST'])
+def admin_register_worker():
+    if not is_admin(request): return jsonify({'success': False, 'error': 'Invalid admin token'}), 401
+    host, weight, error = parse_worker_registration(request.get_json(silent=True) or {})
+    if error: return jsonify({'success': False, 'error': error}), 400
+    changed = register_worker(host, weight)
+    return jsonify({'success': True, 'changed': changed, **list_workers()}), 201 if changed else 200
+
+@app.route('/admin/workers/<host>', methods=['DELETE'])
+def admin_deregister_worker(host):
+    if not is_admin(request): return jsonify({'success': False, 'error': 'Invalid admin token'}), 401
+    if not deregister_worker(host): return jsonify({'success': False, 'error': f'Unknown worker: {host}'}), 404
+    return jsonify({'success': True, **list_workers()}), 200
+
+@app.route('/replicas', methods=['GET'])
+def replicas():
+    with routing_lock:
+        return jsonify({w: {'lag': worker_lag.get(w), 'latency': host_latency.get(w), 'outstanding': host_outstanding[w],
+                            'weight': BALANCER_CONFIG['weights'].get(w, 1.0),
+                            'eligible': worker_lag.get(w) is not None and worker_lag[w] <= LAG_CONFIG['max_lag']}
+                        for w in DB_CONFIG['worker_hosts'] if w}), 200
+
 @app.route('/query', methods=['POST'])
 def handle_query():
     data = request.get_json()
     query = data.get('query', '')
+    params = data.get('params')
     strategy = data.get('strategy', 'random')
+    response_format = data.get('format', 'json')
+    if response_format not in RESPONSE_FORMATS:
+        return jsonify({'success': False, 'error': f'Unsupported format: {response_format}'}), 400
+    params_error = validate_params(query, params)
+    if params_error:
+        return jsonify({'success': False, 'error': params_error}), 400
     
-    if is_read_query(query):
-        if strategy == 'direct': host = DB_CONFIG['manager_host']
-        elif strategy == 'customized':
-            with health_lock:
-                host = min(worker_health, key=worker_health.get) if worker_health else DB_CONFIG['manager_host']
-        else: host = random.choice(DB_CONFIG['worker_hosts'])
-    else:
-        host = DB_CONFIG['manager_host']
+    is_read = is_read_query(query)
+    kind = 'read' if is_read else 'write'
+    if data.get('stream') and is_read:
+        host = select_host(strategy, is_read)
+        g.metric_labels = request_labels('/query', strategy, host, kind)
+        return stream_query(host, query, params)
+    if CACHE_CONFIG['enabled'] and is_read:
+        cached = result_cache.get(query, params)
+        if cached is not None:
+            g.metric_labels = request_labels('/query', strategy, 'cache', kind)
+            return build_response({**cached, 'cached': True}, response_format)
+        snapshot = result_cache.snapshot(query)
 
-    result = execute_query(host, query)
-    return jsonify(result), 200 if result['success'] else 500
+    host = select_host(strategy, is_read)
+    g.metric_labels = request_labels('/query', strategy, host, kind)
+    result = execute_read(host, query, params, g.server_timing) if is_read else execute_write(host, query, params, g.server_timing)
+    if CACHE_CONFIG['enabled'] and result['success']:
+        if is_read: result_cache.put(query, result, snapshot, params)
+        else: result_cache.invalidate(query)
+    serialise_start = time.perf_counter()
+    response = build_response(result, response_format)
+    g.server_timing['serialise'] = time.perf_counter() - serialise_start
+    return response
 
-if __name__ == '__main__':
+@app.route('/batch', methods=['POST'])
+def handle_batch():
+    data = request.get_json()
+    statements = data.get('statements')
+    response_format = data.get('format', 'json')
+    if response_format not in RESPONSE_FORMATS:
+        return jsonify({'success': False, 'error': f'Unsupported format: {response_format}'}), 400
+    error = validate_batch(statements)
+    if error: return jsonify({'success': False, 'error': error}), 400
+    strategy = data.get('strategy', 'random')
+    g.metric_labels = request_labels('/batch', strategy, 'mixed', 'batch')
+    return build_batch_response(execute_batch(statements, strategy), response_format)
+
+def start_background_threads():
     threading.Thread(target=background_health_monitor, daemon=True).start()
+    threading.Thread(target=background_lag_monitor, daemon=True).start()
+    threading.Thread(target=background_pool_reaper, daemon=True).start()
+
+if __name__ == '__main__':
+    start_background_threads()
     app.run(host='0.0.0.0', port=5000)
 PROXY_APP
 
-echo "Creating systemd service for proxy"
-cat > /etc/systemd/system/proxy.service <<'SERVICE'
+echo "Creating async proxy server application"
+cat > /opt/proxy/proxy_async_server.py <<'PROXY_ASYNC_APP'
+from quart import Quart, Response, g, request, jsonify
+from proxy_server import DB_CONFIG, POOL_CONFIG, CACHE_CONFIG, STREAM_CONFIG, RESPONSE_FORMATS, is_read_query, select_host, record_latency, result_cache
+from proxy_server import to_row_result, encode_result, validate_batch, plan_batch, finish_batch
+from proxy_server import metrics, request_labels, request_endpoint, render_metrics, format_server_timing, track_outstanding
+from proxy_server import HEDGE_CONFIG, breaker, is_host_failure, read_latency, available_workers, validate_params, column_names
+from proxy_server import background_health_monitor, background_lag_monitor
+from proxy_server import load_worker_registry, register_worker, deregister_worker, list_workers, parse_worker_registration, is_admin
+import aiomysql
+import asyncio
+import json
+import random
+import threading
+import time
+
+app = Quart(__name__)
+
+pools = {}
+pools_lock = asyncio.Lock()
+
+async def get_pool(host):
+    if host in pools: return pools[host]
+    async with pools_lock:
+        if host not in pools:
+            pools[host] = await aiomysql.create_pool(
+                host=host, user=DB_CONFIG['user'], password=DB_CONFIG['password'], db=DB_CONFIG['database'],
+                minsize=POOL_CONFIG['min_size'], maxsize=POOL_CONFIG['max_size'],
+                pool_recycle=POOL_CONFIG['max_lifetime'], autocommit=True, cursorclass=aiomysql.DictCursor
+            )
+        return pools[host]
+
+async def execute_query(host, query, params=None, timings=None):
+    start = time.time()
+    try:
+        connect_start = time.perf_counter()
+        pool = await get_pool(host)
+        with track_outstanding(host):
+            async with pool.acquire() as connection:
+                async with connection.cursor(aiomysql.Cursor) as cursor:
+                    execute_start = time.perf_counter()
+                    await cursor.execute(query, params)
+                    if cursor.description is not None:
+                        fetch_start = time.perf_counter()
+                        columns = column_names(cursor)
+                        result = {'success': True, 'columns': columns, 'rows': await cursor.fetchall(), 'host': host}
+                    else:
+                        await connection.commit()
+                        fetch_start = time.perf_counter()
+                        result = {'success': True, 'affected_rows': cursor.rowcount, 'host': host}
+                    fetch_end = time.perf_counter()
+                    metrics.observe('proxy_mysql_execution_seconds', (('host', host), ('kind', 'read' if 'rows' in result else 'write')),
+                                    fetch_end - execute_start)
+        if timings is not None:
+            timings.update(connect=execute_start - connect_start, execute=fetch_start - execute_start, fetch=fetch_end - fetch_start)
+        record_latency(host, time.time() - start)
+        breaker.record_success(host)
+        if 'rows' in result: read_latency.record(time.time() - start)
+        return result
+    except Exception as e:
+        if is_host_failure(e): breaker.record_failure(host)
+        return {'success': False, 'error': str(e), 'host': host}
+
+async def execute_hedged(host, query, params=None, timings=None):
+    primary_timings = {}
+    pending = {asyncio.ensure_future(execute_query(host, query, params, primary_timings)): primary_timings}
+    done, _ = await asyncio.wait(pending, timeout=read_latency.get_delay())
+    if done:
+        result = next(iter(done)).result()
+        if result['success']:
+            if timings is not None: timings.update(primary_timings)
+            return result
+        del pending[next(iter(done))]
+    backups = [w for w in available_workers() if w != host]
+    if not backups: return next(iter(done)).result() if done else await next(iter(pending))
+    backup_timings = {}
+    pending[asyncio.ensure_future(execute_query(random.choice(backups), query, params, backup_timings))] = backup_timings
+    result = None
+    while pending:
+        done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for future in done:
+            future_timings = pending.pop(future)
+            result = future.result()
+            if result['success']:
+                metrics.inc('proxy_hedged_reads_total', (('winner', 'primary' if future_timings is primary_timings else 'backup'),))
+                if timings is not None: timings.update(future_timings)
+                return result
+    metrics.inc('proxy_hedged_reads_total', (('winner', 'none'),))
+    return result
+
+async def execute_read(host, query, params=None, timings=None):
+    if HEDGE_CONFIG['enabled'] and host != DB_CONFIG['manager_host']: return await execute_hedged(host, query, params, timings)
+    return await execute_query(host, query, params, timings)
+
+async def execute_transaction(host, queries):
+    start = time.time()
+    try:
+        pool = await get_pool(host)
+        async with pool.acquire() as connection:
+            results = []
+            execute_start = time.perf_counter()
+            await connection.begin()
+            try:
+                async with connection.cursor(aiomysql.Cursor) as cursor:
+                    for query in queries:
+                        await cursor.execute(query)
+                        if cursor.description is not None:
+                            columns = column_names(cursor)
+                            results.append({'success': True, 'columns': columns, 'rows': await cursor.fetchall(), 'host': host})
+                        else:
+                            results.append({'success': True, 'affected_rows': cursor.rowcount, 'host': host})
+                await connection.commit()
+                metrics.observe('proxy_mysql_execution_seconds', (('host', host), ('kind', 'transaction')), time.perf_counter() - execute_start)
+            except aiomysql.MySQLError as e:
+                await connection.rollback()
+                failed = len(results)
+                return [{'success': False, 'error': str(e) if index == failed else 'Transaction rolled back', 'host': host}
+                        for index in range(len(queries))]
+        record_latency(host, time.time() - start)
+        return results
+    except Exception as e:
+        return [{'success': False, 'error': str(e), 'host': host} for _ in queries]
+
+async def execute_read_group(host, queries):
+    return [await execute_query(host, query) for query in queries]
+
+async def execute_batch(statements, strategy):
+    results, read_groups, writes, snapshots = plan_batch(statements, strategy)
+    hosts = list(read_groups)
+    tasks = [execute_read_group(host, [statements[i] for i in read_groups[host]]) for host in hosts]
+    if writes: tasks.append(execute_transaction(DB_CONFIG['manager_host'], [statements[i] for i in writes]))
+    outcomes = await asyncio.gather(*tasks)
+    for host, group_results in zip(hosts, outcomes):
+        for index, result in zip(read_groups[host], group_results): results[index] = result
+    if writes:
+        for index, result in zip(writes, outcomes[-1]): results[index] = result
+    return finish_batch(statements, results, read_groups, writes, snapshots)
+
+def build_response(result, response_format):
+    status = 200 if result['success'] else 500
+    if response_format == 'json': return jsonify(to_row_result(result)), status
+    body, mimetype = encode_result(result, response_format)
+    return Response(body, status=status, mimetype=mimetype)
+
+def build_batch_response(batch, response_format):
+    status = 200 if batch['success'] else 500
+    if response_format == 'json':
+        return jsonify({'success': batch['success'], 'results': [to_row_result(result) for result in batch['results']]}), status
+    body, mimetype = encode_result(batch, response_format)
+    return Response(body, status=status, mimetype=mimetype)
+
+async def stream_query(host, query, params=None):
+    try:
+        pool = await get_pool(host)
+        connection = await pool.acquire()
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e), 'host': host}), 500
+    try:
+        cursor = await connection.cursor(aiomysql.SSDictCursor)
+        await cursor.execute(query, params)
+    except Exception as e:
+        connection.close()
+        pool.release(connection)
+        return jsonify({'success': False, 'error': str(e), 'host': host}), 500
+
+    async def generate():
+        completed = False
+        row_count = 0
+        try:
+            yield json.dumps({'success': True, 'host': host, 'stream': True}) + '\n'
+            while True:
+                rows = await cursor.fetchmany(STREAM_CONFIG['chunk_rows'])
+                if not rows: break
+                row_count += len(rows)
+                yield ''.join(json.dumps(row, default=str) + '\n' for row in rows)
+            await cursor.close()
+            completed = True
+            yield json.dumps({'done': True, 'row_count': row_count}) + '\n'
+        except Exception as e:
+            yield json.dumps({'success': False, 'error': str(e), 'row_count': row_count}) + '\n'
+        finally:
+            if not completed: connection.close()
+            pool.release(connection)
+
+    return Response(generate(), mimetype='application/x-ndjson')
+
+@app.before_serving
+async def startup():
+    threading.Thread(target=background_health_monitor, daemon=True).start()
+    threading.Thread(target=background_lag_monitor, daemon=True).start()
+    for host in [DB_CONFIG['manager_host']] + DB_CONFIG['worker_hosts']:
+        if not host: continue
+        try: await get_pool(host)
+        except Exception: pass
+
+@app.after_serving
+async def shutdown():
+    for pool in pools.values():
+        pool.close()
+        await pool.wait_closed()
+
+@app.before_request
+async def start_request_metrics():
+    g.request_start = time.perf_counter()
+    g.server_timing = {}
+    metrics.inc('proxy_requests_in_flight')
+
+@app.after_request
+async def record_request_metrics(response):
+    elapsed = time.perf_counter() - g.request_start
+    response.headers['Server-Timing'] = format_server_timing({**g.server_timing, 'total': elapsed})
+    labels = g.get('metric_labels')
+    if labels is not None:
+        metrics.inc('proxy_requests_total', labels)
+        metrics.observe('proxy_request_duration_seconds', labels, elapsed)
+    if response.status_code >= 400:
+        metrics.inc('proxy_errors_total', (('endpoint', request_endpoint(request)), ('status', str(response.status_code))))
+    return response
+
+@app.teardown_request
+async def finish_request_metrics(error=None):
+    metrics.inc('proxy_requests_in_flight', value=-1)
+    if error is not None: metrics.inc('proxy_errors_total', (('endpoint', request_endpoint(request)), ('status', '500')))
+
+@app.route('/health', methods=['GET'])
+async def health():
+    return jsonify({'status': 'healthy', 'service': 'proxy', 'mode': 'async'}), 200
+
+@app.route('/pool/stats', methods=['GET'])
+async def pool_stats():
+    return jsonify({host: {'size': pool.size, 'idle': pool.freesize, 'in_use': pool.size - pool.freesize,
+                           'min_size': pool.minsize, 'max_size': pool.maxsize} for host, pool in pools.items()}), 200
+
+@app.route('/cache/stats', methods=['GET'])
+async def cache_stats():
+    return jsonify(result_cache.get_stats()), 200
+
+@app.route('/admin/workers', methods=['GET'])
+async def admin_list_workers():
+    if not is_admin(request): return jsonify({'success': False, 'error': 'Invalid admin token'}), 401
+    load_worker_registry()
+    return jsonify(list_workers()), 200
+
+@app.route('/admin/workers', methods=['POST'])
+async def admin_register_worker():
+    if not is_admin(request): return jsonify({'success': False, 'error': 'Invalid admin token'}), 401
+    host, weight, error = parse_worker_registration(await request.get_json(silent=True) or {})
+    if error: return jsonify({'success': False, 'error': error}), 400
+    changed = register_worker(host, weight)
+    return jsonify({'success': True, 'changed': changed, **list_workers()}), 201 if changed else 200
+
+@app.route('/admin/workers/<host>', methods=['DELETE'])
+async def admin_deregister_worker(host):
+    if not is_admin(request): return jsonify({'success': False, 'error': 'Invalid admin token'}), 401
+    if not deregister_worker(host): return jsonify({'success': False, 'error': f'Unknown worker: {host}'}), 404
+    async with pools_lock:
+        pool = pools.pop(host, None)
+    if pool:
+        pool.close()
+        await pool.wait_closed()
+    return jsonify({'success': True, **list_workers()}), 200
+
+@app.route('/breakers', methods=['GET'])
+async def breakers():
+    return jsonify({'hosts': breaker.get_stats(), 'hedge_delay': read_latency.get_delay() if HEDGE_CONFIG['enabled'] else None}), 200
+
+@app.route('/metrics', methods=['GET'])
+async def metrics_endpoint():
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/query', methods=['POST'])
+async def handle_query():
+    data = await request.get_json()
+    query = data.get('query', '')
+    params = data.get('params')
+    strategy = data.get('strategy', 'random')
+    response_format = data.get('format', 'json')
+    if response_format not in RESPONSE_FORMATS:
+        return jsonify({'success': False, 'error': f'Unsupported format: {response_format}'}), 400
+    params_error = validate_params(query, params)
+    if params_error:
+        return jsonify({'success': False, 'error': params_error}), 400
+
+    is_read = is_read_query(query)
+    kind = 'read' if is_read else 'write'
+    if data.get('stream') and is_read:
+        host = select_host(strategy, is_read)
+        g.metric_labels = request_labels('/query', strategy, host, kind)
+        return await stream_query(host, query, params)
+    if CACHE_CONFIG['enabled'] and is_read:
+        cached = result_cache.get(query, params)
+        if cached is not None:
+            g.metric_labels = request_labels('/query', strategy, 'cache', kind)
+            return build_response({**cached, 'cached': True}, response_format)
+        snapshot = result_cache.snapshot(query)
+
+    host = select_host(strategy, is_read)
+    g.metric_labels = request_labels('/query', strategy, host, kind)
+    result = await (execute_read if is_read else execute_query)(host, query, params, g.server_timing)
+    if CACHE_CONFIG['enabled'] and result['success']:
+        if is_read: result_cache.put(query, result, snapshot, params)
+        else: result_cache.invalidate(query)
+    serialise_start = time.perf_counter()
+    response = build_response(result, response_format)
+    g.server_timing['serialise'] = time.perf_counter() - serialise_start
+    return response
+
+@app.route('/batch', methods=['POST'])
+async def handle_batch():
+    data = await request.get_json()
+    statements = data.get('statements')
+    response_format = data.get('format', 'json')
+    if response_format not in RESPONSE_FORMATS:
+        return jsonify({'success': False, 'error': f'Unsupported format: {response_format}'}), 400
+    error = validate_batch(statements)
+    if error: return jsonify({'success': False, 'error': error}), 400
+    strategy = data.get('strategy', 'random')
+    g.metric_labels = request_labels('/batch', strategy, 'mixed', 'batch')
+    return build_batch_response(await execute_batch(statements, strategy), response_format)
+PROXY_ASYNC_APP
+
+echo "Creating gunicorn configuration for proxy"
+cat > /opt/proxy/gunicorn.conf.py <<'GUNICORN_CONFIG'
+import multiprocessing
+import os
+
+bind = '0.0.0.0:5000'
+workers = int(os.environ.get('PROXY_WORKERS', multiprocessing.cpu_count()))
+threads = int(os.environ.get('PROXY_THREADS', 16))
+worker_class = 'gthread'
+keepalive = 75
+
+def post_worker_init(worker):
+    from proxy_server import start_background_threads
+    start_background_threads()
+GUNICORN_CONFIG
+
+PROXY_MODE="__PROXY_MODE__"
+case "${PROXY_MODE}" in
+    async) PROXY_EXEC="/usr/bin/python3 -m uvicorn proxy_async_server:app --host 0.0.0.0 --port 5000 --no-access-log --workers \${PROXY_WORKERS}" ;;
+    wsgi) PROXY_EXEC="/usr/bin/python3 -m gunicorn -c /opt/proxy/gunicorn.conf.py proxy_server:app" ;;
+    *) PROXY_EXEC="/usr/bin/python3 /opt/proxy/proxy_server.py" ;;
+esac
+
+echo "Creating systemd service for proxy (${PROXY_MODE} mode)"
+cat > /etc/systemd/system/proxy.service <<SERVICE
 [Unit]
 Description=MySQL Cluster Proxy Service
 After=network.target
@@ -123,7 +1592,31 @@ After=network.target
 Type=simple
 User=ubuntu
 WorkingDirectory=/opt/proxy
-ExecStart=/usr/bin/python3 /opt/proxy/proxy_server.py
+Environment=POOL_MIN_SIZE=2
+Environment=POOL_MAX_SIZE=10
+Environment=POOL_MAX_LIFETIME=1800
+Environment=POOL_MAX_IDLE=300
+Environment=PROBE_INTERVAL=2
+Environment=CACHE_ENABLED=0
+Environment=CACHE_TTL=5
+Environment=CACHE_MAX_BYTES=67108864
+Environment=CACHE_GENERATIONS=/dev/shm/proxy-cache-generations
+Environment=BATCH_MAX_STATEMENTS=1000
+Environment=WRITE_COALESCE_ENABLED=0
+Environment=WRITE_COALESCE_WINDOW=0.002
+Environment=WORKER_WEIGHTS=__WORKER_WEIGHTS__
+Environment=BALANCER_CHOICES=2
+Environment=BREAKER_FAILURE_THRESHOLD=5
+Environment=BREAKER_COOLDOWN=10
+Environment=HEDGED_READS_ENABLED=0
+Environment=HEDGE_PERCENTILE=95
+Environment=WORKER_REGISTRY=/opt/proxy/workers.json
+Environment=PROXY_ADMIN_TOKEN=__PROXY_ADMIN_TOKEN__
+Environment=PROXY_WORKERS=$(nproc)
+Environment=PROXY_THREADS=16
+Environment=METRICS_DIR=/dev/shm/proxy-metrics
+ExecStartPre=/bin/rm -rf /dev/shm/proxy-metrics
+ExecStart=${PROXY_EXEC}
 Restart=always
 RestartSec=10
 